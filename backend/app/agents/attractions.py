@@ -1,10 +1,13 @@
 from typing import Any
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import TypeAdapter
 
 from app.agents.base import BaseAgent
-from app.agents.prompt import build_attractions_prompt
-from app.schemas.spot_on import AttractionList
+from app.schemas.spot_on import AttractionOutput
+from app.utils.ids import assign_ids, slugify
+
+
+_ATTRACTION_LIST_ADAPTER = TypeAdapter(list[AttractionOutput])
 
 
 class AttractionsAgent(BaseAgent):
@@ -19,7 +22,8 @@ class AttractionsAgent(BaseAgent):
 
             primary, fallback = self._build_queries(city, current_year, vibe=vibe)
             self.logger.info(
-                f"AttractionsAgent searching with {len(primary)} primary queries",
+                "AttractionsAgent searching with %d primary queries",
+                len(primary),
                 extra={"run_id": state.get("runId"), "destination": city},
             )
 
@@ -45,13 +49,17 @@ class AttractionsAgent(BaseAgent):
             chunk_size = settings.normalize_chunk_size
             structured = await self._normalize_chunked(
                 top,
-                lambda chunk: self._normalize(chunk, qctx, run_id=state.get("runId")),
+                lambda chunk: self._normalize_category(
+                    "attractions", chunk, qctx, run_id=state.get("runId")
+                ),
                 chunk_size=chunk_size,
+                max_tokens=settings.normalize_max_tokens,
+                category="attractions",
             )
 
-            dest = qctx.get("destination_city", "").lower().replace(" ", "_").replace(",", "")
-            for i, item in enumerate(structured, 1):
-                item.id = f"attraction_{dest}_{i}"
+            dest = qctx.get("destination_slug") or slugify(qctx.get("destination_city", ""))
+            travel_spots = await self._dump_items(_ATTRACTION_LIST_ADAPTER, structured)
+            assign_ids(travel_spots, f"attraction_{dest}")
 
             self.logger.info(
                 "AttractionsAgent completed",
@@ -63,48 +71,19 @@ class AttractionsAgent(BaseAgent):
             )
 
             return {
-                "travel_spots": [a.model_dump() for a in structured],
+                "travel_spots": travel_spots,
                 "agent_statuses": {self.agent_id: "completed"},
             }
 
         except Exception as e:
             self.logger.error(
-                f"AttractionsAgent failed: {e}",
+                "AttractionsAgent failed: %s",
+                e,
                 exc_info=True,
                 extra={"run_id": state.get("runId")},
             )
             return self._failed_result(str(e))
 
-    async def _normalize(
-        self, items: list[dict[str, Any]], qctx: dict[str, Any], *, run_id: str | None
-    ) -> list:
-        if not items:
-            return []
-
-        deduped = self._dedup_by_url_and_title(items)
-        search_text = self._format_search_text(deduped, raw_content_limit=0)
-        destination = qctx.get("destination_city")
-
-        system_prompt = build_attractions_prompt(destination=destination, item_count=len(deduped))
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Search results:\n\n{search_text}"),
-        ]
-
-        try:
-            result = await self.deps.llm.structured(messages, AttractionList)
-            self.logger.info(
-                "%s normalize(attractions): deduped=%d llm_out=%d",
-                self.agent_id,
-                len(deduped),
-                len(result.attractions),
-                extra={"run_id": run_id},
-            )
-            return result.attractions
-        except Exception as e:
-            self.logger.error(f"Attractions normalization failed: {e}", exc_info=True)
-            return []
-
     def _build_queries(
         self, city: str, current_year: int, *, vibe: str | None = None
     ) -> tuple[list[str], list[str]]:
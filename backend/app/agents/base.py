@@ -1,13 +1,28 @@
 import asyncio
+import heapq
 import logging
 from abc import ABC, abstractmethod
 from collections.abc import Awaitable, Callable
 from typing import Any
 
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import TypeAdapter
+
+from app.agents.categories import CATEGORIES
+from app.agents.retry import with_retry
 from app.utils.dedup import canonicalize_url, normalize_name
 
+logger = logging.getLogger(__name__)
+
 
 class BaseAgent(ABC):
+    # Lists at least this long are serialized in a worker thread.
+    DUMP_OFFLOAD_THRESHOLD = 20
+    # Search text expected to be at least this many characters is formatted in a worker thread.
+    FORMAT_OFFLOAD_CHARS = 32_000
+    # Longest raw_content any formatter reads; anything past it is dropped at ingest.
+    RAW_CONTENT_CAP = 3000
+
     def __init__(self, agent_id: str, deps: Any) -> None:
         self.agent_id = agent_id
         self.deps = deps
@@ -24,7 +39,7 @@ class BaseAgent(ABC):
             return await asyncio.wait_for(coro, timeout=timeout_seconds)
         except asyncio.TimeoutError:
             self.logger.warning(
-                f"Agent {self.agent_id} timed out after {timeout_seconds}s"
+                "Agent %s timed out after %ss", self.agent_id, timeout_seconds
             )
             return None
 
@@ -37,16 +52,42 @@ class BaseAgent(ABC):
             "warnings": warning_msgs,
         }
 
+    async def _dump_items(self, adapter: TypeAdapter, items: list) -> list[dict[str, Any]]:
+        """Serialize models, off the event loop when the list is large."""
+        if len(items) >= self.DUMP_OFFLOAD_THRESHOLD:
+            return await asyncio.to_thread(adapter.dump_python, items)
+        return adapter.dump_python(items)
+
     async def _normalize_chunked(
         self,
         items: list[dict[str, Any]],
         normalize_fn: Callable[[list[dict[str, Any]]], Awaitable[list]],
         chunk_size: int,
+        max_tokens: int | None = None,
+        *,
+        category: str | None = None,
     ) -> list:
-        if len(items) <= chunk_size:
-            return await normalize_fn(items)
+        """Normalize items in as few LLM calls as the token budget allows.
+
+        With ``max_tokens`` set, everything that fits the budget goes out in one
+        call and larger inputs are split by estimated tokens rather than item
+        count; ``category`` picks the content limits its prompt is built with,
+        so the estimate matches what is actually sent. Without ``max_tokens``,
+        the fixed ``chunk_size`` split is used. There is no
+        outer timeout here: ``normalize_fn`` bounds each LLM attempt itself, so
+        a slow attempt is retried and partially streamed items are kept.
+        """
+        limits: dict[str, int] = {}
+        if category is not None:
+            spec = CATEGORIES[category]
+            limits = {
+                "content_limit": spec.content_limit,
+                "raw_content_limit": spec.raw_content_limit,
+            }
+        chunks = self._chunk_items(items, chunk_size, max_tokens, **limits)
+        if not chunks:
+            return []
 
-        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
         results = await asyncio.gather(
             *[normalize_fn(chunk) for chunk in chunks],
             return_exceptions=True,
@@ -60,6 +101,51 @@ class BaseAgent(ABC):
             merged.extend(batch)
         return merged
 
+    @classmethod
+    def _chunk_items(
+        cls,
+        items: list[dict[str, Any]],
+        chunk_size: int,
+        max_tokens: int | None = None,
+        content_limit: int = 500,
+        raw_content_limit: int = 3000,
+    ) -> list[list[dict[str, Any]]]:
+        """Split items into LLM-sized chunks (by token budget when one is given).
+
+        Tokens are estimated from the text formatted with the given limits.
+        """
+        if len(items) <= chunk_size:
+            return [items] if items else []
+        if not max_tokens:
+            return [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+        def _cost(batch: list[dict[str, Any]]) -> int:
+            return cls._estimate_tokens(
+                cls._format_search_text(batch, content_limit, raw_content_limit)
+            )
+
+        if _cost(items) <= max_tokens:
+            return [items]
+
+        chunks: list[list[dict[str, Any]]] = []
+        current: list[dict[str, Any]] = []
+        used = 0
+        for item in items:
+            cost = _cost([item])
+            if current and used + cost > max_tokens:
+                chunks.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Cheap token estimate (~4 characters per token)."""
+        return len(text) // 4
+
 
     # MIN_RESULTS_THRESHOLD = 15
 
@@ -117,13 +203,21 @@ class BaseAgent(ABC):
         return await asyncio.gather(*tasks)
 
 
+    @staticmethod
+    def _canonical_url(item: dict[str, Any]) -> str:
+        """Canonical URL of a raw search result, computed once and cached on the item."""
+        curl = item.get("_curl")
+        if curl is None:
+            curl = item["_curl"] = canonicalize_url(item.get("url", ""))
+        return curl
+
     @staticmethod
     def _dedup_by_url_and_title(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Deduplicate search results by (canonicalized URL, normalized title) composite key."""
         seen: set[tuple[str, str]] = set()
         unique: list[dict[str, Any]] = []
         for item in items:
-            url = canonicalize_url(item.get("url", ""))
+            url = BaseAgent._canonical_url(item)
             title = normalize_name(item.get("title", ""))
             if not url:
                 continue
@@ -134,9 +228,14 @@ class BaseAgent(ABC):
         return unique
 
 
-    @staticmethod
-    def _flatten_search_results(search_results: list[Any]) -> list[dict[str, Any]]:
-        """Flatten parallel search results, skipping exceptions."""
+    @classmethod
+    def _flatten_search_results(cls, search_results: list[Any]) -> list[dict[str, Any]]:
+        """Flatten parallel search results, skipping exceptions.
+
+        Oversized ``raw_content`` is trimmed in place so full pages are not kept
+        around for the rest of the run.
+        """
+        cap = cls.RAW_CONTENT_CAP
         items: list[dict[str, Any]] = []
         for result_set in search_results:
             if not isinstance(result_set, dict):
@@ -144,32 +243,194 @@ class BaseAgent(ABC):
             if not result_set.get("ok"):
                 continue
             resp = result_set.get("response") or {}
-            items.extend(resp.get("results", []))
+            for item in resp.get("results", []):
+                rc = item.get("raw_content")
+                if rc and len(rc) > cap:
+                    item["raw_content"] = rc[:cap]
+                items.append(item)
         return items
 
     @staticmethod
     def _top_by_score(items: list[dict[str, Any]], n: int = 10) -> list[dict[str, Any]]:
-        """Sort items by score descending and take top N."""
-        return sorted(items, key=lambda x: x.get("score", 0), reverse=True)[:n]
+        """Take the top N items by score (same order as a stable descending sort)."""
+        return heapq.nlargest(n, items, key=lambda x: x.get("score", 0))
+
+    async def _normalize_category(
+        self,
+        category: str,
+        items: list[dict[str, Any]],
+        qctx: dict[str, Any],
+        *,
+        run_id: str | None,
+    ) -> list:
+        """Normalize one category's search results via its CATEGORIES spec."""
+        if not items:
+            return []
+
+        spec = CATEGORIES[category]
+        format_args = (
+            items,
+            spec.content_limit,
+            spec.raw_content_limit,
+            self.deps.settings.normalize_max_tokens,
+        )
+        if self._formatted_size(items, spec.content_limit, spec.raw_content_limit) >= (
+            self.FORMAT_OFFLOAD_CHARS
+        ):
+            search_text, deduped = await asyncio.to_thread(self._dedup_and_format, *format_args)
+        else:
+            search_text, deduped = self._dedup_and_format(*format_args)
+        if spec.heuristic is not None and self._below_llm_threshold(deduped):
+            return [spec.heuristic(x, qctx) for x in deduped]
+        direct = spec.materialize(deduped)
+        if direct is not None:
+            self.logger.info(
+                "%s normalize(%s): direct=true items=%d",
+                self.agent_id,
+                spec.label,
+                len(direct),
+                extra={"run_id": run_id},
+            )
+            return direct
+
+        system_prompt, context = spec.build_prompt(qctx, len(deduped))
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"{context}\n\nSearch results:\n\n{search_text}"),
+        ]
+
+        # Bound each attempt so one slow response is retried; the chunk as a
+        # whole takes at most max_attempts timeouts plus the retry backoff.
+        timeout = spec.llm_timeout or self.deps.settings.agent_normalize_timeout
+        collected: list = []
+
+        async def _collect() -> list:
+            collected.clear()
+            async for item in self.deps.llm.stream_structured(
+                messages, spec.list_schema, spec.list_field
+            ):
+                collected.append(item)
+            return collected
+
+        try:
+            normalized = await with_retry(
+                lambda: asyncio.wait_for(_collect(), timeout=timeout)
+            )
+            self.logger.info(
+                "%s normalize(%s): deduped=%d llm_out=%d",
+                self.agent_id,
+                spec.label,
+                len(deduped),
+                len(normalized),
+                extra={"run_id": run_id},
+            )
+            return normalized
+        except Exception as e:
+            if collected:
+                self.logger.warning(
+                    "%s normalization stopped early (%s); keeping %d streamed items",
+                    spec.label,
+                    e,
+                    len(collected),
+                    extra={"run_id": run_id},
+                )
+                return list(collected)
+            self.logger.error(
+                "%s normalization failed: %s", spec.label, e, exc_info=True
+            )
+            return []
+
+    def _below_llm_threshold(self, deduped: list[dict[str, Any]]) -> bool:
+        """True when there are too few results to be worth an LLM call."""
+        return len(deduped) <= self.deps.settings.min_llm_items
+
+    @staticmethod
+    def _formatted_size(
+        items: list[dict[str, Any]], content_limit: int, raw_content_limit: int
+    ) -> int:
+        """Upper bound on the characters of page text that formatting will copy."""
+        return sum(
+            min(len(item.get("content") or ""), content_limit)
+            + min(len(item.get("raw_content") or ""), raw_content_limit)
+            for item in items
+        )
 
     @staticmethod
+    def _format_one(
+        item: dict[str, Any], content_limit: int, raw_content_limit: int
+    ) -> str:
+        """Format one search result (without its ``[i/total]`` prefix)."""
+        parts = [
+            "Title: ", str(item.get("title", "N/A")),
+            "\nURL: ", str(item.get("url", "N/A")),
+            "\nContent: ", item.get("content", "N/A")[:content_limit],
+        ]
+        rc = (item.get("raw_content") or "")[:raw_content_limit]
+        if rc:
+            parts.extend(("\nPage Content: ", rc))
+        return "".join(parts)
+
+    @staticmethod
+    def _join_blocks(blocks: list[str]) -> str:
+        total = len(blocks)
+        header = f"Total items: {total} — you MUST output exactly {total} structured items.\n\n"
+        return header + "\n\n".join(
+            f"[{idx}/{total}] {block}" for idx, block in enumerate(blocks, 1)
+        )
+
+    @classmethod
     def _format_search_text(
+        cls,
         items: list[dict[str, Any]],
         content_limit: int = 500,
         raw_content_limit: int = 3000,
     ) -> str:
         """Format search result items into text for LLM input."""
-        total = len(items)
-        parts: list[str] = []
-        for idx, item in enumerate(items, 1):
-            block = (
-                f"[{idx}/{total}] Title: {item.get('title', 'N/A')}\n"
-                f"URL: {item.get('url', 'N/A')}\n"
-                f"Content: {item.get('content', 'N/A')[:content_limit]}"
-            )
-            rc = (item.get("raw_content") or "")[:raw_content_limit]
-            if rc:
-                block += f"\nPage Content: {rc}"
-            parts.append(block)
-        header = f"Total items: {total} — you MUST output exactly {total} structured items.\n\n"
-        return header + "\n\n".join(parts)
+        return cls._join_blocks(
+            [cls._format_one(item, content_limit, raw_content_limit) for item in items]
+        )
+
+    @classmethod
+    def _dedup_and_format(
+        cls,
+        items: list[dict[str, Any]],
+        content_limit: int = 500,
+        raw_content_limit: int = 3000,
+        max_total_tokens: int | None = None,
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """Dedup by (URL, title) and format the survivors in one pass.
+
+        Returns the LLM input text and the items it contains. Items arrive
+        sorted by score, so anything past ``max_total_tokens`` is dropped from
+        the tail.
+        """
+        seen: set[tuple[str, str]] = set()
+        unique: list[dict[str, Any]] = []
+        blocks: list[str] = []
+        used = 0
+        for idx, item in enumerate(items):
+            url = cls._canonical_url(item)
+            if not url:
+                continue
+            key = (url, normalize_name(item.get("title", "")))
+            if key in seen:
+                continue
+            block = cls._format_one(item, content_limit, raw_content_limit)
+            used += cls._estimate_tokens(block)
+            if max_total_tokens and blocks and used > max_total_tokens:
+                # Count only the unique, URL-bearing items that would have made
+                # it into the prompt, not duplicates further down the tail.
+                dropped = {key}
+                for rest in items[idx + 1:]:
+                    rest_url = cls._canonical_url(rest)
+                    if rest_url:
+                        dropped.add((rest_url, normalize_name(rest.get("title", ""))))
+                logger.info(
+                    "Search text over token budget, dropped_items=%d",
+                    len(dropped - seen),
+                )
+                break
+            seen.add(key)
+            unique.append(item)
+            blocks.append(block)
+        return cls._join_blocks(blocks), unique
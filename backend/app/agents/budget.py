@@ -1,7 +1,7 @@
-import json
 import logging
 from typing import Any
 
+import orjson
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.agents.base import BaseAgent
@@ -38,7 +38,7 @@ class BudgetAgent(BaseAgent):
 
         data_text = self._format_results(main_results)
 
-        system_prompt = build_report_prompt(
+        system_prompt, context = build_report_prompt(
             destination=destination,
             departing_date=departing_date,
             returning_date=returning_date,
@@ -47,7 +47,7 @@ class BudgetAgent(BaseAgent):
 
         messages = [
             SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Travel data:\n\n{data_text}"),
+            HumanMessage(content=f"{context}\n\nTravel data:\n\n{data_text}"),
         ]
 
         try:
@@ -99,7 +99,7 @@ class BudgetAgent(BaseAgent):
             section_lines = [f"## {category.replace('_', ' ').title()} ({len(items)} items)"]
             for item in items:
                 clean = {k: v for k, v in item.items() if v not in (None, "", [], {})}
-                section_lines.append(json.dumps(clean, indent=2))
+                section_lines.append(orjson.dumps(clean, option=orjson.OPT_INDENT_2).decode())
             sections.append("\n".join(section_lines))
 
         return "\n\n".join(sections)
@@ -0,0 +1,191 @@
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, get_args
+
+from pydantic import BaseModel, ValidationError
+
+from app.agents.prompt import (
+    PromptParts,
+    build_attractions_prompt,
+    build_car_rental_prompt,
+    build_flight_prompt,
+    build_hotel_prompt,
+    build_restaurant_prompt,
+)
+from app.schemas.spot_on import (
+    AttractionList,
+    CarRentalList,
+    CarRentalOutput,
+    FlightList,
+    FlightOutput,
+    HotelList,
+    RestaurantList,
+)
+
+_TITLE_SPLIT = re.compile(r"\s+[|\-–—:]\s+")
+_PRICE_PER_DAY = re.compile(r"\$\s?(\d+(?:\.\d+)?)\s*(?:/|per)\s*day", re.I)
+_PRICE = re.compile(r"\$\s?(\d[\d,]*)")
+
+
+@dataclass(frozen=True)
+class CategorySpec:
+    """How one result category is normalized: prompt, schema and fallback parser."""
+
+    label: str
+    list_schema: type[BaseModel]
+    list_field: str
+    # Returns (static system prompt, run-specific context for the user message).
+    build_prompt: Callable[[dict[str, Any], int], PromptParts]
+    # Maps a lone search result straight to an output (see MIN_LLM_ITEMS). Only
+    # set where one result is one offering; a restaurant/attraction/hotel page is
+    # often a listicle the LLM splits into several venues.
+    heuristic: Callable[[dict[str, Any], dict[str, Any]], BaseModel] | None = None
+    content_limit: int = 500
+    raw_content_limit: int = 0
+    # Per-attempt LLM timeout; None uses AGENT_NORMALIZE_TIMEOUT.
+    llm_timeout: float | None = None
+
+    @property
+    def item_schema(self) -> type[BaseModel]:
+        return get_args(self.list_schema.model_fields[self.list_field].annotation)[0]
+
+    def materialize(self, items: list[dict[str, Any]]) -> list[BaseModel] | None:
+        """Build outputs straight from items that already carry the schema's fields.
+
+        Returns None (use the LLM) unless every item has all required fields and
+        validates; ids are assigned later, so a missing ``id`` is allowed.
+        """
+        schema = self.item_schema
+        required = _required_fields(schema)
+        if not items or any(not required <= item.keys() for item in items):
+            return None
+        try:
+            return [schema.model_validate({"id": "", **item}) for item in items]
+        except ValidationError:
+            return None
+
+
+@lru_cache(maxsize=None)
+def _required_fields(schema: type[BaseModel]) -> frozenset[str]:
+    return frozenset(
+        name for name, field in schema.model_fields.items() if field.is_required() and name != "id"
+    )
+
+
+def title_name(title: str | None) -> str:
+    """Leading name part of a search result title ("Foo | Yelp" -> "Foo")."""
+    return _TITLE_SPLIT.split((title or "").strip(), maxsplit=1)[0] or "N/A"
+
+
+def heuristic_snippet(item: dict[str, Any], limit: int = 200) -> str:
+    """First sentence(s) of a result's content, capped at ``limit`` chars."""
+    content = " ".join((item.get("content") or "").split())
+    if len(content) <= limit:
+        return content or "N/A"
+    cut = content[:limit]
+    end = cut.rfind(". ")
+    return cut[: end + 1] if end > 0 else cut
+
+
+def flight_endpoints(qctx: dict[str, Any]) -> tuple[str | None, str | None]:
+    origin = qctx.get("origin_code") if qctx.get("origin_code") else qctx.get("origin_city")
+    destination = qctx.get("destination_code") if qctx.get("destination_code") else qctx.get("destination_city")
+    return origin, destination
+
+
+def trip_type(qctx: dict[str, Any]) -> str:
+    return "round-trip" if qctx.get("returning_date") else "one-way"
+
+
+def _car_from_result(item: dict[str, Any], qctx: dict[str, Any]) -> CarRentalOutput:
+    price = _PRICE_PER_DAY.search(f"{item.get('title', '')} {item.get('content', '')}")
+    return CarRentalOutput(
+        id="",
+        provider=title_name(item.get("title")),
+        price_per_day=price.group(1) if price else None,
+        url=item.get("url", ""),
+        why_recommended=f"Car rental option found for {qctx.get('destination_city')}.",
+    )
+
+
+def _flight_from_result(item: dict[str, Any], qctx: dict[str, Any]) -> FlightOutput:
+    origin, destination = flight_endpoints(qctx)
+    price = _PRICE.search(f"{item.get('title', '')} {item.get('content', '')}")
+    return FlightOutput(
+        id="",
+        route=f"{origin} -> {destination}",
+        trip_type=trip_type(qctx),
+        price_range=price.group(1).replace(",", "") if price else None,
+        url=item.get("url", ""),
+        snippet=heuristic_snippet(item),
+        why_recommended=f"Flight option found from {origin} to {destination}.",
+    )
+
+
+def _flight_prompt(qctx: dict[str, Any], item_count: int) -> PromptParts:
+    origin, destination = flight_endpoints(qctx)
+    return build_flight_prompt(
+        origin=origin,
+        destination=destination,
+        departing_date=qctx.get("departing_date"),
+        returning_date=qctx.get("returning_date"),
+        trip_type=trip_type(qctx),
+        item_count=item_count,
+    )
+
+
+CATEGORIES: dict[str, CategorySpec] = {
+    "restaurants": CategorySpec(
+        label="restaurants",
+        list_schema=RestaurantList,
+        list_field="restaurants",
+        build_prompt=lambda q, n: build_restaurant_prompt(
+            destination=q.get("destination_city"), item_count=n
+        ),
+    ),
+    "attractions": CategorySpec(
+        label="attractions",
+        list_schema=AttractionList,
+        list_field="attractions",
+        build_prompt=lambda q, n: build_attractions_prompt(
+            destination=q.get("destination_city"), item_count=n
+        ),
+    ),
+    "hotels": CategorySpec(
+        label="hotels",
+        list_schema=HotelList,
+        list_field="hotels",
+        build_prompt=lambda q, n: build_hotel_prompt(
+            destination=q.get("destination_city"),
+            departing_date=q.get("departing_date", ""),
+            returning_date=q.get("returning_date"),
+            stay_nights=q.get("stay_nights"),
+            item_count=n,
+        ),
+    ),
+    "cars": CategorySpec(
+        label="cars",
+        list_schema=CarRentalList,
+        list_field="cars",
+        build_prompt=lambda q, n: build_car_rental_prompt(
+            destination=q.get("destination_city"),
+            departing_date=q.get("departing_date"),
+            returning_date=q.get("returning_date"),
+            item_count=n,
+        ),
+        heuristic=_car_from_result,
+        content_limit=400,
+        llm_timeout=25.0,
+    ),
+    "flights": CategorySpec(
+        label="flights",
+        list_schema=FlightList,
+        list_field="flights",
+        build_prompt=_flight_prompt,
+        heuristic=_flight_from_result,
+        content_limit=400,
+        llm_timeout=25.0,
+    ),
+}
@@ -18,6 +18,9 @@ from app.utils.dedup import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
+# Page text handed to the LLM per extracted page.
+PAGE_CONTENT_CHARS = 5000
+
 ENRICHABLE_FIELDS: dict[str, list[str]] = {
     "restaurant": ["operating_hours", "menu_url", "reservation_url", "price_range", "cuisine", "rating"],
     "attraction": ["operating_hours", "admission_price", "reservation_url", "kind"],
@@ -60,25 +63,44 @@ DOMAIN_FILTER: dict[str, dict[str, list[str]]] = {
     },
 }
 
+class _CallBudget:
+    """Tavily calls left for one enrichment pass, shared by its concurrent batches."""
+
+    def __init__(self, cap: int) -> None:
+        self.left = cap
+
+    def take(self) -> bool:
+        """Claim one call, if any is left."""
+        if self.left <= 0:
+            return False
+        self.left -= 1
+        return True
+
+
 class EnrichmentAgent(BaseAgent):
+    # Gap batches enriched concurrently in one pass, replacing the graph's
+    # second EnrichAgent loop. They draw on one shared TAVILY_CALL_CAP budget.
+    PARALLEL_BATCHES = 2
+
     async def execute(self, state: dict[str, Any]) -> dict[str, Any]:
         try:
             timeout = self.deps.settings.agent_enrich_timeout
             loop_count = state.get("enrichment_loop_count", 0)
-            # Shared mutable dict — _run() writes here incrementally
-            self._partial: dict[str, dict[str, Any]] = {
+            # Shared mutable dict — _run() writes here incrementally. Kept local:
+            # the agent instance is shared by concurrent runs.
+            partial: dict[str, dict[str, Any]] = {
                 k: dict(v) for k, v in state.get("enriched_data", {}).items()
             }
             result = await self.with_timeout(
-                self._run(state), timeout_seconds=timeout
+                self._run(state, partial), timeout_seconds=timeout
             )
             if result is not None:
                 return result
             # Timeout — return whatever we collected
-            filled = sum(1 for v in self._partial.values() if v)
+            filled = sum(1 for v in partial.values() if v)
             self.logger.info("EnrichAgent timed out with %d partial items saved", filled)
             return {
-                "enriched_data": self._partial,
+                "enriched_data": partial,
                 "enrichment_gap_ratio": 0.6,
                 "enrichment_loop_count": loop_count + 1,
                 "agent_statuses": {self.agent_id: "partial"},
@@ -88,12 +110,11 @@ class EnrichmentAgent(BaseAgent):
             self.logger.error("EnrichAgent failed: %s", e, exc_info=True)
             return self._failed_result(str(e))
 
-    async def _run(self, state: dict[str, Any]) -> dict[str, Any]:
-        tavily_call_cap = self.deps.settings.tavily_call_cap
-        tavily_calls = 0
+    async def _run(
+        self, state: dict[str, Any], enriched: dict[str, dict[str, Any]]
+    ) -> dict[str, Any]:
         loop_count = state.get("enrichment_loop_count", 0)
 
-        enriched = self._partial
         total_enrichable = self._count_total_enrichable_fields(state)
         max_items = self.deps.settings.enrich_max_items_per_pass
 
@@ -119,23 +140,75 @@ class EnrichmentAgent(BaseAgent):
             extra={"run_id": state.get("runId")},
         )
 
-        extract_urls = [g["url"] for g in gaps if g.get("url")]
+        # Group gaps by page first so no URL is extracted by two batches, then
+        # interleave the groups so every batch gets a share of the easiest gaps.
+        # Batches touch disjoint item ids, so they can all write into ``enriched``.
+        by_url: dict[str, list[dict[str, Any]]] = {}
+        for g in gaps:
+            key = canonicalize_url(g["url"]) if g.get("url") else f"id:{g['id']}"
+            by_url.setdefault(key, []).append(g)
+        groups = list(by_url.values())
+        batches = [
+            [g for group in groups[i :: self.PARALLEL_BATCHES] for g in group]
+            for i in range(min(self.PARALLEL_BATCHES, len(groups)))
+        ]
+        budget = _CallBudget(self.deps.settings.tavily_call_cap)
         seen_urls: set[str] = set()
-        unique_urls: list[str] = []
-        for u in extract_urls:
-            cu = canonicalize_url(u)
-            if cu not in seen_urls:
-                seen_urls.add(cu)
-                unique_urls.append(u)
+        tavily_calls = sum(
+            await asyncio.gather(
+                *(self._enrich_batch(batch, enriched, seen_urls, budget) for batch in batches)
+            )
+        )
+
+        all_gaps = self._scan_missing_fields(state, enriched)
+        total_missing = sum(len(g["missing_fields"]) for g in all_gaps)
+        gap_ratio = total_missing / total_enrichable if total_enrichable > 0 else 0.0
 
+        self.logger.info(
+            "EnrichAgent completed: enriched %d items, %d Tavily calls, gap_ratio=%.2f, loop=%d",
+            len(enriched),
+            tavily_calls,
+            gap_ratio,
+            loop_count,
+            extra={"run_id": state.get("runId")},
+        )
+
+        status = "completed" if enriched else "partial"
+        return {
+            "enriched_data": enriched,
+            "enrichment_gap_ratio": gap_ratio,
+            "enrichment_loop_count": loop_count + 1,
+            "agent_statuses": {self.agent_id: status},
+        }
+
+    async def _enrich_batch(
+        self,
+        gaps: list[dict[str, Any]],
+        enriched: dict[str, dict[str, Any]],
+        seen_urls: set[str],
+        budget: _CallBudget,
+    ) -> int:
+        """One extract -> search -> extract pass over ``gaps``; returns Tavily calls made.
+
+        ``seen_urls`` and ``budget`` are shared between the pass's concurrent
+        batches, so a page discovered by one batch is not extracted again by
+        another and together they stay within TAVILY_CALL_CAP.
+        """
+        tavily_calls = 0
+
+        unique_urls: list[str] = []
         url_to_gaps: dict[str, list[dict[str, Any]]] = {}
         for g in gaps:
-            cu = canonicalize_url(g.get("url", ""))
+            u = g.get("url", "")
+            cu = canonicalize_url(u)
             url_to_gaps.setdefault(cu, []).append(g)
+            if u and cu not in seen_urls:
+                seen_urls.add(cu)
+                unique_urls.append(u)
 
-        if unique_urls and tavily_calls < tavily_call_cap:
+        if unique_urls:
             for batch_start in range(0, len(unique_urls), 20):
-                if tavily_calls >= tavily_call_cap:
+                if not budget.take():
                     break
                 batch = unique_urls[batch_start : batch_start + 20]
                 tavily_calls += 1
@@ -146,27 +219,25 @@ class EnrichmentAgent(BaseAgent):
                         if isinstance(extract_resp, dict)
                         else []
                     )
-                    parse_tasks = []
+                    parse_requests = []
                     parse_meta = []
                     for page in pages:
                         page_url = canonicalize_url(page.get("url", ""))
                         matching_gaps = url_to_gaps.get(page_url, [])
                         for gap in matching_gaps:
-                            parse_tasks.append(
-                                self._fill_from_content(
-                                    page.get("raw_content", ""),
+                            parse_requests.append(
+                                (
+                                    (page.get("raw_content") or "")[:PAGE_CONTENT_CHARS],
                                     gap["type"],
                                     gap["missing_fields"],
                                 )
                             )
                             parse_meta.append(gap)
 
-                    if parse_tasks:
-                        results = await asyncio.gather(
-                            *parse_tasks, return_exceptions=True
-                        )
+                    if parse_requests:
+                        results = await self._fill_from_contents(parse_requests)
                         for gap, result in zip(parse_meta, results):
-                            if isinstance(result, Exception) or not result:
+                            if not result:
                                 continue
                             enriched.setdefault(gap["id"], {}).update(
                                 {k: v for k, v in result.items() if v not in (None, "", [], {})}
@@ -176,7 +247,7 @@ class EnrichmentAgent(BaseAgent):
 
         remaining_gaps = self._rescan_after_enrichment(gaps, enriched)
 
-        if remaining_gaps and tavily_calls < tavily_call_cap:
+        if remaining_gaps and budget.left > 0:
             queries = await self._generate_queries(remaining_gaps)
 
             if queries:
@@ -187,11 +258,11 @@ class EnrichmentAgent(BaseAgent):
                 discovered_url_meta: dict[str, dict[str, Any]] = {}
 
                 for eq in queries:
-                    if tavily_calls >= tavily_call_cap:
-                        break
                     target = gap_by_id.get(eq.item_id)
                     if not target:
                         continue
+                    if not budget.take():
+                        break
 
                     domain_conf = DOMAIN_FILTER.get(target["type"], {})
                     include_domains = domain_conf.get("include")
@@ -219,12 +290,15 @@ class EnrichmentAgent(BaseAgent):
                         )
                         for r in results_list:
                             url = r.get("url", "")
-                            if url and canonicalize_url(url) not in seen_urls:
-                                seen_urls.add(canonicalize_url(url))
+                            if not url:
+                                continue
+                            cu = canonicalize_url(url)
+                            if cu not in seen_urls:
+                                seen_urls.add(cu)
                                 discovered_urls.append(url)
-                                discovered_url_meta[canonicalize_url(url)] = target
+                                discovered_url_meta[cu] = target
 
-                if discovered_urls and tavily_calls < tavily_call_cap:
+                if discovered_urls and budget.take():
                     tavily_calls += 1
                     try:
                         extract2 = await self.deps.tavily.extract(
@@ -235,28 +309,26 @@ class EnrichmentAgent(BaseAgent):
                             if isinstance(extract2, dict)
                             else []
                         )
-                        parse_tasks = []
+                        parse_requests = []
                         parse_meta = []
                         for page in pages2:
                             page_url = canonicalize_url(page.get("url", ""))
                             target = discovered_url_meta.get(page_url)
                             if not target:
                                 continue
-                            parse_tasks.append(
-                                self._fill_from_content(
-                                    page.get("raw_content", ""),
+                            parse_requests.append(
+                                (
+                                    (page.get("raw_content") or "")[:PAGE_CONTENT_CHARS],
                                     target["type"],
                                     target["missing_fields"],
                                 )
                             )
                             parse_meta.append(target)
 
-                        if parse_tasks:
-                            results = await asyncio.gather(
-                                *parse_tasks, return_exceptions=True
-                            )
+                        if parse_requests:
+                            results = await self._fill_from_contents(parse_requests)
                             for target, result in zip(parse_meta, results):
-                                if isinstance(result, Exception) or not result:
+                                if not result:
                                     continue
                                 e = enriched.setdefault(target["id"], {})
                                 for k, v in result.items():
@@ -265,26 +337,7 @@ class EnrichmentAgent(BaseAgent):
                     except Exception as e:
                         self.logger.warning("EnrichAgent extract P2 failed: %s", e)
 
-        all_gaps = self._scan_missing_fields(state, enriched)
-        total_missing = sum(len(g["missing_fields"]) for g in all_gaps)
-        gap_ratio = total_missing / total_enrichable if total_enrichable > 0 else 0.0
-
-        self.logger.info(
-            "EnrichAgent completed: enriched %d items, %d Tavily calls, gap_ratio=%.2f, loop=%d",
-            len(enriched),
-            tavily_calls,
-            gap_ratio,
-            loop_count,
-            extra={"run_id": state.get("runId")},
-        )
-
-        status = "completed" if enriched else "partial"
-        return {
-            "enriched_data": enriched,
-            "enrichment_gap_ratio": gap_ratio,
-            "enrichment_loop_count": loop_count + 1,
-            "agent_statuses": {self.agent_id: status},
-        }
+        return tavily_calls
 
     @staticmethod
     def _scan_missing_fields(
@@ -372,32 +425,38 @@ class EnrichmentAgent(BaseAgent):
             self.logger.warning("LLM query generation failed: %s", e)
             return []
 
-    async def _fill_from_content(
-        self,
-        content: str,
-        item_type: str,
-        missing_fields: list[str],
-    ) -> dict[str, Any] | None:
-        """Parse page content with LLM to extract missing fields."""
-        if not content:
-            return None
-
-        content = content[:5000]
-        schema = ENRICHMENT_SCHEMAS.get(item_type)
-        if not schema:
-            return None
-
-        system_prompt = build_enrichment_prompt(
-            item_type=item_type, missing_fields=missing_fields
-        )
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Webpage content:\n\n{content}"),
-        ]
-
-        try:
-            result = await self.deps.llm.structured(messages, schema)
-            return result.model_dump()
-        except Exception as e:
-            self.logger.debug("LLM parsing failed: %s", e)
-            return None
+    async def _fill_from_contents(
+        self, requests: list[tuple[str, str, list[str]]]
+    ) -> list[dict[str, Any] | None]:
+        """Parse page contents with the LLM in one batch to extract missing fields.
+
+        Each request is ``(content, item_type, missing_fields)``; results line up
+        with the requests, ``None`` where there was nothing to parse or parsing failed.
+        """
+        jobs = []
+        job_idx = []
+        for i, (content, item_type, missing_fields) in enumerate(requests):
+            schema = ENRICHMENT_SCHEMAS.get(item_type)
+            if not content or not schema:
+                continue
+            system_prompt = build_enrichment_prompt(
+                item_type=item_type,
+                missing_fields=tuple(missing_fields) if missing_fields else None,
+            )
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=f"Webpage content:\n\n{content}"),
+            ]
+            jobs.append((messages, schema))
+            job_idx.append(i)
+
+        filled: list[dict[str, Any] | None] = [None] * len(requests)
+        if not jobs:
+            return filled
+        results = await self.deps.llm.batch_structured(jobs)
+        for i, result in zip(job_idx, results):
+            if isinstance(result, BaseException):
+                self.logger.debug("LLM parsing failed: %s", result)
+                continue
+            filled[i] = result.model_dump()
+        return filled
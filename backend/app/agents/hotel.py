@@ -1,10 +1,13 @@
 from typing import Any
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import TypeAdapter
 
 from app.agents.base import BaseAgent
-from app.agents.prompt import build_hotel_prompt
-from app.schemas.spot_on import HotelList
+from app.schemas.spot_on import HotelOutput
+from app.utils.ids import assign_ids, slugify
+
+
+_HOTEL_LIST_ADAPTER = TypeAdapter(list[HotelOutput])
 
 
 class HotelAgent(BaseAgent):
@@ -19,7 +22,8 @@ class HotelAgent(BaseAgent):
 
             primary, fallback = self._build_queries(city, current_year, budget=budget)
             self.logger.info(
-                f"HotelAgent searching with {len(primary)} primary queries",
+                "HotelAgent searching with %d primary queries",
+                len(primary),
                 extra={"run_id": state.get("runId"), "destination": city},
             )
 
@@ -45,13 +49,17 @@ class HotelAgent(BaseAgent):
             chunk_size = settings.normalize_chunk_size
             structured = await self._normalize_chunked(
                 top,
-                lambda chunk: self._normalize(chunk, qctx, run_id=state.get("runId")),
+                lambda chunk: self._normalize_category(
+                    "hotels", chunk, qctx, run_id=state.get("runId")
+                ),
                 chunk_size=chunk_size,
+                max_tokens=settings.normalize_max_tokens,
+                category="hotels",
             )
 
-            dest = qctx.get("destination_city", "").lower().replace(" ", "_").replace(",", "")
-            for i, item in enumerate(structured, 1):
-                item.id = f"hotel_{dest}_{i}"
+            dest = qctx.get("destination_slug") or slugify(qctx.get("destination_city", ""))
+            hotels = await self._dump_items(_HOTEL_LIST_ADAPTER, structured)
+            assign_ids(hotels, f"hotel_{dest}")
 
             self.logger.info(
                 "HotelAgent completed",
@@ -63,59 +71,19 @@ class HotelAgent(BaseAgent):
             )
 
             return {
-                "hotels": [h.model_dump() for h in structured],
+                "hotels": hotels,
                 "agent_statuses": {self.agent_id: "completed"},
             }
 
         except Exception as e:
             self.logger.error(
-                f"HotelAgent failed: {e}",
+                "HotelAgent failed: %s",
+                e,
                 exc_info=True,
                 extra={"run_id": state.get("runId")},
             )
             return self._failed_result(str(e))
 
-    async def _normalize(
-        self, items: list[dict[str, Any]], qctx: dict[str, Any], *, run_id: str | None
-    ) -> list:
-        if not items:
-            return []
-
-        deduped = self._dedup_by_url_and_title(items)
-        search_text = self._format_search_text(deduped, raw_content_limit=0)
-
-        destination = qctx.get("destination_city")
-        departing_date = qctx.get("departing_date", "")
-        returning_date = qctx.get("returning_date")
-        stay_nights = qctx.get("stay_nights")
-
-        system_prompt = build_hotel_prompt(
-            destination=destination,
-            departing_date=departing_date,
-            returning_date=returning_date,
-            stay_nights=stay_nights,
-            item_count=len(deduped)
-        )
-
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Search results:\n\n{search_text}"),
-        ]
-
-        try:
-            result = await self.deps.llm.structured(messages, HotelList)
-            self.logger.info(
-                "%s normalize(hotels): deduped=%d llm_out=%d",
-                self.agent_id,
-                len(deduped),
-                len(result.hotels),
-                extra={"run_id": run_id},
-            )
-            return result.hotels
-        except Exception as e:
-            self.logger.error(f"Hotel normalization failed: {e}", exc_info=True)
-            return []
-
     def _build_queries(
         self, city: str, current_year: int, *, budget: str | None = None
     ) -> tuple[list[str], list[str]]:
@@ -1,42 +1,53 @@
-def build_restaurant_prompt(*, destination: str, item_count: int) -> str:
-    return f"""ROLE: You are an data extraction specialist .
+from functools import lru_cache
 
-TASK: Normalize ALL restaurant search results for {destination} into structured output.
+# Normalization and report builders return (system, context). The system half
+# never contains run data, so it is byte-identical across runs and the
+# provider's prompt-prefix cache can reuse it; the context is sent at the head
+# of the user message.
+PromptParts = tuple[str, str]
 
-RULES:
-- Output EXACTLY {item_count} items — one per search result. Do NOT merge, drop, or invent items.
-- NO DUPLICATES
 
-FIELDS:
-- id: "restaurant_<destination>_<number>" (e.g., restaurant_paris_1)
-- name: Exact restaurant name as stated in source
-- cuisine: Standard label (e.g., "Italian", "Korean BBQ", "Seafood") — null if not stated
-- area: Neighborhood/district (e.g. "Los Angeles, CA", "Paris, France") — null if not mentioned
-- price_range: "$", "$$", "$$$", or "$$$$" — null if not inferable
-- url: Exact source URL, copied verbatim
-- snippet: 1-2 factual sentences from the source
-- why_recommended: 1-2 sentences on suitability for a first-day visitor
-- tags: 2-4 from [michelin-star, local-favorite, vegetarian-friendly, late-night, outdoor-seating, iconic, hidden-gem, family-friendly, date-spot, quick-bite]
+NORMALIZE_PREAMBLE = """ROLE: You are a data extraction specialist.
+
+TASK: Normalize ALL search results for the category described below into structured output.
 
+RULES:
+- One item per search result. Do NOT merge, drop, or invent items.
+- NO DUPLICATES
+- url: Exact source URL, copied verbatim — never rewrite or shorten it
 
 STEPS:
-1. Identify the fields requirement for restaurants
+1. Identify the fields requirement for the category below
 2. Convert string input to list of sources (each source has title, url, content)
 3. Extract fields from source text and page_content per source
 4. Normalize each unique source into structured output
 
 CALIBRATION: If < 80% confident a value is correct, set to null.
+
+CONTEXT (destination, dates, item count) is given at the top of the user message.
 """
 
 
-def build_attractions_prompt(*, destination: str, item_count: int) -> str:
-    return f"""ROLE: You are a data extraction specialist.
+def _context(item_count: int, *lines: str) -> str:
+    body = "\n".join(f"- {line}" for line in lines)
+    return f"CONTEXT:\n{body}\n\nOutput EXACTLY {item_count} items."
 
-TASK: Normalize ALL attraction search results for {destination} into structured output.
 
-RULES:
-- Output EXACTLY {item_count} items — one per search result. Do NOT merge, drop, or invent items.
-- NO DUPLICATES
+_RESTAURANT_FIELDS = """CATEGORY: restaurants
+
+FIELDS:
+- id: "restaurant_<destination>_<number>" (e.g., restaurant_paris_1)
+- name: Exact restaurant name as stated in source
+- cuisine: Standard label (e.g., "Italian", "Korean BBQ", "Seafood") — null if not stated
+- area: Neighborhood/district (e.g. "Los Angeles, CA", "Paris, France") — null if not mentioned
+- price_range: "$", "$$", "$$$", or "$$$$" — null if not inferable
+- url: Exact source URL, copied verbatim
+- snippet: 1-2 factual sentences from the source
+- why_recommended: 1-2 sentences on suitability for a first-day visitor
+- tags: 2-4 from [michelin-star, local-favorite, vegetarian-friendly, late-night, outdoor-seating, iconic, hidden-gem, family-friendly, date-spot, quick-bite]"""
+
+
+_ATTRACTIONS_FIELDS = """CATEGORY: attractions
 
 FIELDS:
 - id: "attraction_<destination_city>_<number>"
@@ -46,40 +57,10 @@ FIELDS:
 - url: Exact source URL
 - snippet: 1-2 factual sentences from source
 - why_recommended: Why essential for first-time visitor
-- estimated_duration_min: Visit duration in minutes. Use source if available; estimate conservatively (museums: 90-120, parks: 60-90, landmarks: 30-60)
+- estimated_duration_min: Visit duration in minutes. Use source if available; estimate conservatively (museums: 90-120, parks: 60-90, landmarks: 30-60)"""
 
-STEPS:
-1. Identify the fields requirement for attractions
-2. Convert string input to list of sources (each source has title, url, content)
-3. Extract fields from source text and page_content per source
-4. Normalize each unique source into structured output
-
-CALIBRATION: If < 80% confident a value is correct, set to null.
-"""
-
-
-def build_hotel_prompt(
-    *,
-    destination: str,
-    departing_date: str,
-    returning_date: str | None,
-    stay_nights: int | None = None,
-    item_count: int,
-) -> str:
-    return f"""ROLE: You are a data extraction specialist.
-
-TASK: Normalize ALL hotel search results for {destination} into structured output.
-
-RULES:
-- Output EXACTLY {item_count} items — one per search result. Do NOT merge, drop, or invent items.
-- NO DUPLICATES
-
-
-CONTEXT:
-- Check-in: {departing_date}
-- Check-out: {returning_date or "Not specified"}
-- Stay: {stay_nights or "Not specified"} nights
 
+_HOTEL_FIELDS = """CATEGORY: hotels
 
 FIELDS:
 - id: "hotel_<destination_city>_<number>"
@@ -89,32 +70,10 @@ FIELDS:
 - url: Exact source URL
 - snippet: 1-2 factual sentences from source
 - why_recommended: Why it suits a visitor. Mention location advantages
-- amenities: Confirmed amenities only, from [wifi, pool, gym, breakfast-included, parking, spa, restaurant, airport-shuttle, pet-friendly]
+- amenities: Confirmed amenities only, from [wifi, pool, gym, breakfast-included, parking, spa, restaurant, airport-shuttle, pet-friendly]"""
 
 
-STEPS:
-1. Identify the fields requirement for hotels
-2. Convert string input to list of sources (each source has title, url, content)
-3. Extract fields from source text and page_content per source
-4. Normalize each unique source into structured output
-
-
-CALIBRATION: If < 80% confident a value is correct, set to null.
-"""
-
-
-def build_car_rental_prompt(*, destination: str, departing_date: str, returning_date: str | None = None, item_count: int) -> str:
-    return f"""ROLE: You are a data extraction specialist.
-
-TASK: Normalize ALL car rental search results for {destination} into structured output.
-
-CONTEXT:
-- Pickup date: {departing_date}
-- Return date: {returning_date or "Not specified"}
-
-RULES:
-- Output EXACTLY {item_count} items — one per search result. Do NOT merge, drop, or invent items.
-- NO DUPLICATES
+_CAR_RENTAL_FIELDS = """CATEGORY: car rentals
 
 FIELDS:
 - id: "car_<destination_city>_<number>"
@@ -123,19 +82,73 @@ FIELDS:
 - price_per_day: Daily rental rate as numeric value in USD (e.g., "45", "80") — null if not stated
 - pickup_location: Pickup location (e.g., "Airport Terminal 1") — null if unknown
 - url: Exact source URL
-- why_recommended: 1-2 sentences on why practical for a visitor
+- why_recommended: 1-2 sentences on why practical for a visitor"""
 
 
-STEPS:
-1. Identify the fields requirement for car rentals
-2. Convert string input to list of sources (each source has title, url, content)
-3. Extract fields from source text and page_content per source
-4. Normalize each unique source into structured output
+_FLIGHT_FIELDS = """CATEGORY: flights
 
+FIELDS:
+- id: "flight_<origin_code>_<dest_code>_<number>"
+- airline: Airline name — null if source is aggregator without specific airline
+- route: "<city/code> -> <city/code>" (e.g., "LAX -> NRT")
+- trip_type: Must equal the trip type given in CONTEXT — do not override
+- price_range: Price/range with currency (e.g., "$450", "$350-$600") — null if not stated
+- url: Exact source URL
+- snippet: 1-2 factual sentences about the option
+- why_recommended: Why it stands out (direct flight, best price, schedule convenience)"""
+
+
+@lru_cache(maxsize=512)
+def build_restaurant_prompt(*, destination: str, item_count: int) -> PromptParts:
+    return (
+        NORMALIZE_PREAMBLE + "\n" + _RESTAURANT_FIELDS,
+        _context(item_count, f"Destination: {destination}"),
+    )
 
-CALIBRATION: If < 80% confident a value is correct, set to null."""
 
+@lru_cache(maxsize=512)
+def build_attractions_prompt(*, destination: str, item_count: int) -> PromptParts:
+    return (
+        NORMALIZE_PREAMBLE + "\n" + _ATTRACTIONS_FIELDS,
+        _context(item_count, f"Destination: {destination}"),
+    )
 
+
+@lru_cache(maxsize=512)
+def build_hotel_prompt(
+    *,
+    destination: str,
+    departing_date: str,
+    returning_date: str | None,
+    stay_nights: int | None = None,
+    item_count: int,
+) -> PromptParts:
+    return (
+        NORMALIZE_PREAMBLE + "\n" + _HOTEL_FIELDS,
+        _context(
+            item_count,
+            f"Destination: {destination}",
+            f"Check-in: {departing_date}",
+            f"Check-out: {returning_date or 'Not specified'}",
+            f"Stay: {stay_nights or 'Not specified'} nights",
+        ),
+    )
+
+
+@lru_cache(maxsize=512)
+def build_car_rental_prompt(*, destination: str, departing_date: str, returning_date: str | None = None, item_count: int) -> PromptParts:
+    return (
+        NORMALIZE_PREAMBLE + "\n" + _CAR_RENTAL_FIELDS,
+        _context(
+            item_count,
+            f"Destination: {destination}",
+            f"Pickup date: {departing_date}",
+            f"Return date: {returning_date or 'Not specified'}",
+        ),
+    )
+
+
+@lru_cache(maxsize=512)
 def build_flight_prompt(
     *,
     origin: str,
@@ -144,97 +157,85 @@ def build_flight_prompt(
     returning_date: str | None,
     trip_type: str,
     item_count: int,
-) -> str:
-    return f"""ROLE: You are a data extraction specialist.
+) -> PromptParts:
+    return (
+        NORMALIZE_PREAMBLE + "\n" + _FLIGHT_FIELDS,
+        _context(
+            item_count,
+            f"Route: {origin} to {destination}",
+            f"Departure: {departing_date}",
+            f"Return: {returning_date or 'N/A (one-way)'}",
+            f"Trip type: {trip_type}",
+        ),
+    )
 
-TASK: Normalize ALL flight search results from {origin} to {destination} into structured output.
 
-CONTEXT:
-- Departure: {departing_date}
-- Return: {returning_date or "N/A (one-way)"}
-- Trip type: {trip_type}
+ENRICHMENT_PREAMBLE = """ROLE: You are a data extraction specialist converting unstructured webpage content into precise structured records.
 
-RULES:
-- Output EXACTLY {item_count} items — one per search result. Do NOT merge, drop, or invent items.
-- NO DUPLICATES
-
-FIELDS:
-- id: "flight_<origin_code>_<dest_code>_<number>"
-- airline: Airline name — null if source is aggregator without specific airline
-- route: "<city/code> -> <city/code>" (e.g., "LAX -> NRT")
-- trip_type: Must be "{trip_type}" — do not override
-- price_range: Price/range with currency (e.g., "$450", "$350-$600") — null if not stated
-- url: Exact source URL
-- snippet: 1-2 factual sentences about the option
-- why_recommended: Why it stands out (direct flight, best price, schedule convenience)
+TASK: Extract structured details from webpage content for the listing type given below.
 
+RULES:
+1. Extract ONLY information explicitly stated on the page
+2. Do NOT infer from context or general knowledge
+3. If conflicting values, prefer the most specific/recent
 
-STEPS:
-1. Identify the fields requirement for flights
-2. Convert string input to list of sources (each source has title, url, content)
-3. Extract fields from source text and page_content per source
-4. Normalize each unique source into structured output
+CALIBRATION: If < 80% confident a value is correct, set to null.
+"""
 
+_ENRICHMENT_FIELD_DESCRIPTIONS: dict[str, str] = {
+    "operating_hours": "operating_hours: Operating hours as stated on page — copy verbatim",
+    "menu_url": "menu_url: Full URL to the menu if explicitly present — null otherwise",
+    "reservation_url": "reservation_url: Full URL to reservation/booking if explicitly present — null otherwise",
+    "price_range": "price_range: Price range (e.g., '$$', '$$$') — null if not inferable",
+    "cuisine": "cuisine: Cuisine label if explicitly stated — null otherwise",
+    "rating": "rating: Numeric rating score (e.g., 4.5) from a review source like Google, Yelp, TripAdvisor — null if not stated",
+    "kind": "kind: Attraction type (museum, park, landmark, etc.) — null if unclear",
+    "admission_price": "admission_price: Admission/ticket price as stated — null otherwise",
+    "price_per_night": "price_per_night: Per-night hotel rate as numeric value in USD (e.g., '150') — null if not stated",
+    "amenities": "amenities: Confirmed amenities list — empty list if none found",
+    "price_per_day": "price_per_day: Daily car rental rate as numeric value in USD (e.g., '45') — null if not stated",
+    "vehicle_class": "vehicle_class: Vehicle type (economy, compact, sedan, SUV, luxury, etc.) — null if not stated",
+    "airline": "airline: Airline name — null if not stated",
+}
 
-CALIBRATION: If < 80% confident a value is correct, set to null."""
+_ENRICHMENT_DEFAULT_FIELDS = (
+    "- cuisine: Cuisine label if explicitly stated (restaurants only) — null otherwise\n"
+    "- kind: Attraction kind if explicitly stated (attractions only) — null otherwise\n"
+    "- menu_url: Full URL to the menu if explicitly present (restaurants only) — null otherwise\n"
+    "- reservation_url: Full URL to reservation/booking if explicitly present — null otherwise\n"
+    "- admission_price: Admission/ticket price as stated (attractions only) — null otherwise\n"
+    "- operating_hours: Operating hours as stated on page — copy verbatim\n"
+    "- price_range: Price range (e.g., '$$', '$$$') — null if not inferable\n"
+    "- price_per_night: Per-night rate as numeric value in USD (hotels only) — null if not stated\n"
+    "- amenities: Confirmed amenities list (hotels only) — empty list if none"
+)
 
 
+@lru_cache(maxsize=512)
 def build_enrichment_prompt(
-    *, item_type: str, missing_fields: list[str] | None = None
+    *, item_type: str, missing_fields: tuple[str, ...] | None = None
 ) -> str:
     type_hint = TYPE_HINTS.get(item_type, "Focus on: price, hours, address, phone")
 
     if missing_fields:
-        field_descriptions = {
-            "operating_hours": "operating_hours: Operating hours as stated on page — copy verbatim",
-            "menu_url": "menu_url: Full URL to the menu if explicitly present — null otherwise",
-            "reservation_url": "reservation_url: Full URL to reservation/booking if explicitly present — null otherwise",
-            "price_range": "price_range: Price range (e.g., '$$', '$$$') — null if not inferable",
-            "cuisine": "cuisine: Cuisine label if explicitly stated — null otherwise",
-            "rating": "rating: Numeric rating score (e.g., 4.5) from a review source like Google, Yelp, TripAdvisor — null if not stated",
-            "kind": "kind: Attraction type (museum, park, landmark, etc.) — null if unclear",
-            "admission_price": "admission_price: Admission/ticket price as stated — null otherwise",
-            "price_per_night": "price_per_night: Per-night hotel rate as numeric value in USD (e.g., '150') — null if not stated",
-            "amenities": "amenities: Confirmed amenities list — empty list if none found",
-            "price_per_day": "price_per_day: Daily car rental rate as numeric value in USD (e.g., '45') — null if not stated",
-            "vehicle_class": "vehicle_class: Vehicle type (economy, compact, sedan, SUV, luxury, etc.) — null if not stated",
-            "airline": "airline: Airline name — null if not stated",
-        }
         fields_text = "\n".join(
-            f"- {field_descriptions.get(f, f'{f}: Extract if present — null otherwise')}"
+            "- " + _ENRICHMENT_FIELD_DESCRIPTIONS.get(f, f"{f}: Extract if present — null otherwise")
             for f in missing_fields
         )
     else:
-        fields_text = (
-            "- cuisine: Cuisine label if explicitly stated (restaurants only) — null otherwise\n"
-            "- kind: Attraction kind if explicitly stated (attractions only) — null otherwise\n"
-            "- menu_url: Full URL to the menu if explicitly present (restaurants only) — null otherwise\n"
-            "- reservation_url: Full URL to reservation/booking if explicitly present — null otherwise\n"
-            "- admission_price: Admission/ticket price as stated (attractions only) — null otherwise\n"
-            "- operating_hours: Operating hours as stated on page — copy verbatim\n"
-            "- price_range: Price range (e.g., '$$', '$$$') — null if not inferable\n"
-            "- price_per_night: Per-night rate as numeric value in USD (hotels only) — null if not stated\n"
-            "- amenities: Confirmed amenities list (hotels only) — empty list if none"
-        )
+        fields_text = _ENRICHMENT_DEFAULT_FIELDS
 
-    return f"""ROLE: You are a data extraction specialist converting unstructured webpage content into precise structured records.
-
-TASK: Extract structured details from webpage content for a {item_type} listing.
+    return ENRICHMENT_PREAMBLE + f"""
+LISTING TYPE: {item_type}
 
 TYPE FOCUS:
 {type_hint}
 
 FIELDS (set to null if confidence < 80%):
-{fields_text}
-
-RULES:
-1. Extract ONLY information explicitly stated on the page
-2. Do NOT infer from context or general knowledge
-3. If conflicting values, prefer the most specific/recent
-
-CALIBRATION: If < 80% confident a value is correct, set to null."""
+{fields_text}"""
 
 
+@lru_cache(maxsize=512)
 def build_location_normalization_prompt() -> str:
     return """You are a travel location normalization service.
 
@@ -264,6 +265,7 @@ Input: "London" → destination_city: "London, UK", destination_code: "LHR"
 """
 
 
+@lru_cache(maxsize=512)
 def build_enrichment_query_prompt() -> str:
     return """ROLE: You are a search query specialist. Given items with missing data fields, generate targeted search queries to find the missing information.
 
@@ -287,35 +289,46 @@ Steps:
 4. Use quotes around the item name for exact matching"""
 
 
+REPORT_SYSTEM = """ROLE: You are a travel planning expert synthesizing research into a concise trip summary.
+
+TASK: Estimate the total trip budget for the destination in CONTEXT (top of the user message).
+
+OUTPUT:
+- Calculate total_estimated_budget for the trip based on available prices
+- Include transport, accommodation, dining, and attraction costs
+- If prices are missing, note "Partial estimate" and sum available prices only
+
+RULES:
+- Use ONLY price data from the provided items — do not invent prices
+- Format as a dollar amount (e.g., "$1,200 - $1,800")"""
+
+
+@lru_cache(maxsize=512)
 def build_report_prompt(
     *,
     destination: str,
     departing_date: str,
     returning_date: str | None,
     stay_nights: int | None,
-) -> str:
+) -> PromptParts:
     duration = f"{stay_nights} nights" if stay_nights else "flexible duration"
     return_info = f"Return: {returning_date}" if returning_date else "One-way trip"
 
-    return f"""ROLE: You are a travel planning expert synthesizing research into a concise trip summary.
-
-TASK: Estimate the total trip budget for {destination}.
-
-CONTEXT:
+    return REPORT_SYSTEM, f"""CONTEXT:
+- Destination: {destination}
 - Departure: {departing_date}
 - {return_info}
-- Duration: {duration}
+- Duration: {duration}"""
 
-OUTPUT:
-- Calculate total_estimated_budget for the trip based on available prices
-- Include transport, accommodation, dining, and attraction costs
-- If prices are missing, note "Partial estimate" and sum available prices only
 
-RULES:
-- Use ONLY price data from the provided items — do not invent prices
-- Format as a dollar amount (e.g., "$1,200 - $1,800")"""
+_MONTH_NAMES: dict[str, str] = {
+    "01": "January", "02": "February", "03": "March", "04": "April",
+    "05": "May", "06": "June", "07": "July", "08": "August",
+    "09": "September", "10": "October", "11": "November", "12": "December",
+}
 
 
+@lru_cache(maxsize=512)
 def build_recommendation_prompt(
     *,
     origin: str,
@@ -326,12 +339,7 @@ def build_recommendation_prompt(
     climate: str,
 ) -> str:
     month = departing_date[5:7] if len(departing_date) >= 7 else "unknown"
-    month_names = {
-        "01": "January", "02": "February", "03": "March", "04": "April",
-        "05": "May", "06": "June", "07": "July", "08": "August",
-        "09": "September", "10": "October", "11": "November", "12": "December",
-    }
-    month_name = month_names.get(month, month)
+    month_name = _MONTH_NAMES.get(month, month)
     return_info = f"Return: {returning_date}" if returning_date else "One-way / flexible return"
 
     return f"""ROLE: You are an expert travel advisor who recommends ideal destinations based on traveler preferences.
@@ -1,10 +1,13 @@
 from typing import Any
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import TypeAdapter
 
 from app.agents.base import BaseAgent
-from app.agents.prompt import build_restaurant_prompt
-from app.schemas.spot_on import RestaurantList
+from app.schemas.spot_on import RestaurantOutput
+from app.utils.ids import assign_ids, slugify
+
+
+_RESTAURANT_LIST_ADAPTER = TypeAdapter(list[RestaurantOutput])
 
 
 class RestaurantAgent(BaseAgent):
@@ -26,7 +29,8 @@ class RestaurantAgent(BaseAgent):
 
             primary, fallback = self._build_queries(city, current_year, vibe=vibe, budget=budget)
             self.logger.info(
-                f"RestaurantAgent searching with {len(primary)} primary queries",
+                "RestaurantAgent searching with %d primary queries",
+                len(primary),
                 extra={"run_id": state.get("runId"), "destination": city},
             )
 
@@ -54,14 +58,18 @@ class RestaurantAgent(BaseAgent):
             chunk_size = settings.normalize_chunk_size
             structured = await self._normalize_chunked(
                 top,
-                lambda chunk: self._normalize(chunk, qctx, run_id=state.get("runId")),
+                lambda chunk: self._normalize_category(
+                    "restaurants", chunk, qctx, run_id=state.get("runId")
+                ),
                 chunk_size=chunk_size,
+                max_tokens=settings.normalize_max_tokens,
+                category="restaurants",
             )
 
             # Reindex IDs to avoid collisions across chunks
-            dest = qctx.get("destination_city", "").lower().replace(" ", "_").replace(",", "")
-            for i, item in enumerate(structured, 1):
-                item.id = f"restaurant_{dest}_{i}"
+            dest = qctx.get("destination_slug") or slugify(qctx.get("destination_city", ""))
+            restaurants = await self._dump_items(_RESTAURANT_LIST_ADAPTER, structured)
+            assign_ids(restaurants, f"restaurant_{dest}")
 
             self.logger.info(
                 "RestaurantAgent completed",
@@ -73,48 +81,19 @@ class RestaurantAgent(BaseAgent):
             )
 
             return {
-                "restaurants": [r.model_dump() for r in structured],
+                "restaurants": restaurants,
                 "agent_statuses": {self.agent_id: "completed"},
             }
 
         except Exception as e:
             self.logger.error(
-                f"RestaurantAgent failed: {e}",
+                "RestaurantAgent failed: %s",
+                e,
                 exc_info=True,
                 extra={"run_id": state.get("runId")},
             )
             return self._failed_result(str(e))
 
-    async def _normalize(
-        self, items: list[dict[str, Any]], qctx: dict[str, Any], *, run_id: str | None
-    ) -> list:
-        if not items:
-            return []
-
-        deduped = self._dedup_by_url_and_title(items)
-        search_text = self._format_search_text(deduped, raw_content_limit=0)
-        destination = qctx.get("destination_city")
-
-        system_prompt = build_restaurant_prompt(destination=destination, item_count=len(deduped))
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Search results:\n\n{search_text}"),
-        ]
-
-        try:
-            result = await self.deps.llm.structured(messages, RestaurantList)
-            self.logger.info(
-                "%s normalize(restaurants): deduped=%d llm_out=%d",
-                self.agent_id,
-                len(deduped),
-                len(result.restaurants),
-                extra={"run_id": run_id},
-            )
-            return result.restaurants
-        except Exception as e:
-            self.logger.error(f"Restaurant normalization failed: {e}", exc_info=True)
-            return []
-
     def _build_queries(
         self, city: str, current_year: int, *, vibe: str | None = None, budget: str | None = None
     ) -> tuple[list[str], list[str]]:
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_LLM_ERRORS: tuple[type[BaseException], ...] = (
+    RateLimitError,
+    APITimeoutError,
+    APIConnectionError,
+    InternalServerError,
+    TimeoutError,
+)
+
+
+async def with_retry(
+    fn: Callable[[], Awaitable[T]],
+    *,
+    max_attempts: int = 3,
+    base_delay: float = 0.5,
+    retry_on: tuple[type[BaseException], ...] = TRANSIENT_LLM_ERRORS,
+) -> T:
+    """Await ``fn()`` with bounded exponential backoff on transient errors.
+
+    Only exceptions in ``retry_on`` are retried; anything else (and the last
+    transient failure) propagates to the caller unchanged.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except retry_on as e:
+            attempt += 1
+            if attempt >= max_attempts:
+                raise
+            delay = base_delay * 2 ** (attempt - 1) + random.uniform(0, 0.1)
+            logger.warning(
+                "Transient error (%s), retrying in %.2fs (attempt %d/%d)",
+                type(e).__name__,
+                delay,
+                attempt + 1,
+                max_attempts,
+            )
+            await asyncio.sleep(delay)
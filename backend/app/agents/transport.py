@@ -1,11 +1,26 @@
 import asyncio
+import re
 from typing import Any
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import TypeAdapter
 
 from app.agents.base import BaseAgent
-from app.agents.prompt import build_car_rental_prompt, build_flight_prompt
-from app.schemas.spot_on import CarRentalList, FlightList
+from app.schemas.spot_on import CarRentalOutput, FlightOutput
+from app.utils.dedup import normalize_name
+from app.utils.ids import assign_ids, slugify
+
+
+_CAR_HINT = re.compile(
+    r"\b(car[ -]?rentals?|rent[ -]a[ -]car|hire car|hertz|avis|sixt|enterprise|rentalcars)\b",
+    re.I,
+)
+_FLIGHT_HINT = re.compile(
+    r"\b(flights?|airlines?|airfares?|nonstop|one[ -]way|round[ -]trip)\b", re.I
+)
+
+_SEARCH_LABELS: tuple[str, str] = ("Car rental", "Flight")
+_CAR_LIST_ADAPTER = TypeAdapter(list[CarRentalOutput])
+_FLIGHT_LIST_ADAPTER = TypeAdapter(list[FlightOutput])
 
 
 class TransportAgent(BaseAgent):
@@ -18,71 +33,35 @@ class TransportAgent(BaseAgent):
     async def execute(self, state: dict[str, Any]) -> dict[str, Any]:
         try:
             qctx = state.get("query_context", {})
-            settings = self.deps.settings
+            run_id = state.get("runId")
 
             self.logger.info(
                 "TransportAgent starting parallel car + flight searches",
-                extra={"run_id": state.get("runId")},
+                extra={"run_id": run_id},
             )
 
-            car_results, flight_results = await asyncio.gather(
-                self._search_car_rentals(qctx, run_id=state.get("runId")),
-                self._search_flights(qctx, run_id=state.get("runId")),
-                return_exceptions=True,
+            norm_cars, norm_flights, car_error, flight_error = (
+                await self._search_and_normalize_pipelined(qctx, run_id=run_id)
             )
 
-            cars = [] if isinstance(car_results, Exception) else car_results
-            flights = [] if isinstance(flight_results, Exception) else flight_results
-
-            if isinstance(car_results, Exception) and isinstance(
-                flight_results, Exception
-            ):
+            if car_error is not None and flight_error is not None:
                 self.logger.error("Both car and flight searches failed")
                 return self._failed_result("Both transport searches failed")
 
             warnings: list[str] = []
-            status = "completed"
-
-            if isinstance(car_results, Exception):
-                warnings.append("Car rental search failed")
-                status = "partial"
-                self.logger.warning(f"Car rental search failed: {car_results}")
-
-            if isinstance(flight_results, Exception):
-                warnings.append("Flight search failed")
-                status = "partial"
-                self.logger.warning(f"Flight search failed: {flight_results}")
-
-            chunk_size = settings.normalize_chunk_size
-            norm_cars, norm_flights = await asyncio.gather(
-                self._normalize_chunked(
-                    cars,
-                    lambda chunk: self._normalize_cars(chunk, qctx, run_id=state.get("runId")),
-                    chunk_size=chunk_size,
-                ),
-                self._normalize_chunked(
-                    flights,
-                    lambda chunk: self._normalize_flights(chunk, qctx, run_id=state.get("runId")),
-                    chunk_size=chunk_size,
-                ),
-                return_exceptions=True,
+            for label, error in zip(_SEARCH_LABELS, (car_error, flight_error)):
+                if error is not None:
+                    warnings.append(f"{label} search failed")
+                    self.logger.warning("%s search failed: %s", label, error)
+            status = "partial" if warnings else "completed"
+
+            dest = qctx.get("destination_slug") or slugify(qctx.get("destination_city", ""))
+            car_dump, flight_dump = await asyncio.gather(
+                self._dump_items(_CAR_LIST_ADAPTER, norm_cars),
+                self._dump_items(_FLIGHT_LIST_ADAPTER, norm_flights),
             )
-
-            if isinstance(norm_cars, Exception):
-                self.logger.warning(f"Car normalization failed: {norm_cars}")
-                norm_cars = []
-            if isinstance(norm_flights, Exception):
-                self.logger.warning(
-                    f"Flight normalization failed: {norm_flights}",
-                    extra={"run_id": state.get("runId"), "error_type": type(norm_flights).__name__}
-                )
-                norm_flights = []
-
-            dest = qctx.get("destination_city", "").lower().replace(" ", "_").replace(",", "")
-            for i, item in enumerate(norm_cars, 1):
-                item.id = f"car_{dest}_{i}"
-            for i, item in enumerate(norm_flights, 1):
-                item.id = f"flight_{dest}_{i}"
+            car_rentals = assign_ids(car_dump, f"car_{dest}")
+            flight_items = assign_ids(flight_dump, f"flight_{dest}")
 
             self.logger.info(
                 "TransportAgent completed",
@@ -95,8 +74,8 @@ class TransportAgent(BaseAgent):
             )
 
             result: dict[str, Any] = {
-                "car_rentals": [c.model_dump() for c in norm_cars],
-                "flights": [f.model_dump() for f in norm_flights],
+                "car_rentals": car_rentals,
+                "flights": flight_items,
                 "agent_statuses": {self.agent_id: status},
             }
 
@@ -107,12 +86,62 @@ class TransportAgent(BaseAgent):
 
         except Exception as e:
             self.logger.error(
-                f"TransportAgent failed: {e}",
+                "TransportAgent failed: %s",
+                e,
                 exc_info=True,
                 extra={"run_id": state.get("runId")},
             )
             return self._failed_result(str(e))
 
+    async def _search_and_normalize_pipelined(
+        self, qctx: dict[str, Any], *, run_id: str | None
+    ) -> tuple[list, list, BaseException | None, BaseException | None]:
+        """Search and normalize each category independently.
+
+        Whichever search finishes first starts normalizing right away instead of
+        waiting on the slower one. Results already claimed by the other category
+        are skipped so aggregator pages are only normalized once, and results
+        that clearly belong to the other category are handed over to it and
+        normalized once both pipelines are done.
+        """
+        settings = self.deps.settings
+        seen: set[tuple[str, str]] = set()
+        handoff: dict[str, list[dict[str, Any]]] = {"cars": [], "flights": []}
+
+        def _normalize(category: str, items: list[dict[str, Any]]) -> Any:
+            return self._normalize_chunked(
+                items,
+                lambda chunk: self._normalize_category(category, chunk, qctx, run_id=run_id),
+                chunk_size=settings.normalize_chunk_size,
+                max_tokens=settings.normalize_max_tokens,
+                category=category,
+            )
+
+        async def _pipeline(category: str, search: Any) -> list:
+            raw = await asyncio.wait_for(search, timeout=settings.agent_search_timeout)
+            own, other = self._route_transport_items(category, self._claim_unseen(raw, seen))
+            handoff["flights" if category == "cars" else "cars"].extend(other)
+            return await _normalize(category, own)
+
+        car_out, flight_out = await asyncio.gather(
+            _pipeline("cars", self._search_car_rentals(qctx, run_id=run_id)),
+            _pipeline("flights", self._search_flights(qctx, run_id=run_id)),
+            return_exceptions=True,
+        )
+        car_error = car_out if isinstance(car_out, BaseException) else None
+        flight_error = flight_out if isinstance(flight_out, BaseException) else None
+        norm_cars = [] if car_error else car_out
+        norm_flights = [] if flight_error else flight_out
+
+        if handoff["cars"] or handoff["flights"]:
+            extra_cars, extra_flights = await asyncio.gather(
+                _normalize("cars", handoff["cars"]),
+                _normalize("flights", handoff["flights"]),
+            )
+            norm_cars = [*norm_cars, *extra_cars]
+            norm_flights = [*norm_flights, *extra_flights]
+        return norm_cars, norm_flights, car_error, flight_error
+
     async def _search_car_rentals(
         self, qctx: dict[str, Any], *, run_id: str | None
     ) -> list[dict[str, Any]]:
@@ -195,80 +224,41 @@ class TransportAgent(BaseAgent):
                              "expedia.com", "trip.com", "momondo.com"],
         )
 
-    async def _normalize_cars(
-        self, items: list[dict[str, Any]], qctx: dict[str, Any], *, run_id: str | None
-    ) -> list:
-        if not items:
-            return []
-
-        deduped = self._dedup_by_url_and_title(items)
-        search_text = self._format_search_text(deduped, content_limit=400, raw_content_limit=0)
-        destination = qctx.get("destination_city")
-        departing_date = qctx.get("departing_date")
-        returning_date = qctx.get("returning_date")
-
-        system_prompt = build_car_rental_prompt(
-            destination=destination,
-            departing_date=departing_date,
-            returning_date=returning_date,
-            item_count=len(deduped)
-        )
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Search results:\n\n{search_text}"),
-        ]
-
-        try:
-            result = await self.deps.llm.structured(messages, CarRentalList)
-            self.logger.info(
-                "%s normalize(cars): deduped=%d llm_out=%d",
-                self.agent_id,
-                len(deduped),
-                len(result.cars),
-                extra={"run_id": run_id},
+    @staticmethod
+    def _claim_unseen(
+        items: list[dict[str, Any]], seen: set[tuple[str, str]]
+    ) -> list[dict[str, Any]]:
+        """Keep items whose (url, title) key is not in ``seen``, recording the new keys."""
+        unique: list[dict[str, Any]] = []
+        for item in items:
+            key = (
+                TransportAgent._canonical_url(item),
+                normalize_name(item.get("title", "")),
             )
-            return result.cars
-        except Exception as e:
-            self.logger.error(f"Car rental normalization failed: {e}", exc_info=True)
-            return []
-
-    async def _normalize_flights(
-        self, items: list[dict[str, Any]], qctx: dict[str, Any], *, run_id: str | None
-    ) -> list:
-        if not items:
-            return []
-
-        deduped = self._dedup_by_url_and_title(items)
-        search_text = self._format_search_text(deduped, content_limit=400, raw_content_limit=0)
-        origin = qctx.get("origin_code") if qctx.get("origin_code") else qctx.get("origin_city")
-        destination = qctx.get("destination_code") if qctx.get("destination_code") else qctx.get("destination_city")
-        departing_date = qctx.get("departing_date")
-        returning_date = qctx.get("returning_date")
-        trip_type = "round-trip" if returning_date else "one-way"
-
-        system_prompt = build_flight_prompt(
-            origin=origin,
-            destination=destination,
-            departing_date=departing_date,
-            returning_date=returning_date,
-            trip_type=trip_type,
-            item_count=len(deduped)
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(item)
+        return unique
+
+    @staticmethod
+    def _route_transport_items(
+        category: str, items: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Split ``category``'s results into (own, misrouted).
+
+        A result whose title/URL only matches the other category's keywords is
+        reassigned to it instead of being normalized into the wrong schema.
+        """
+        own_hint, other_hint = (
+            (_CAR_HINT, _FLIGHT_HINT) if category == "cars" else (_FLIGHT_HINT, _CAR_HINT)
         )
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Search results:\n\n{search_text}"),
-        ]
-
-        try:
-            result = await self.deps.llm.structured(messages, FlightList)
-            self.logger.info(
-                "%s normalize(flights): deduped=%d llm_out=%d",
-                self.agent_id,
-                len(deduped),
-                len(result.flights),
-                extra={"run_id": run_id},
-            )
-            return result.flights
-        except Exception as e:
-            self.logger.error(f"Flight normalization failed: {e}", exc_info=True)
-            return []
+        own: list[dict[str, Any]] = []
+        other: list[dict[str, Any]] = []
+        for item in items:
+            text = f"{item.get('title', '')} {item.get('url', '')}"
+            if other_hint.search(text) and not own_hint.search(text):
+                other.append(item)
+            else:
+                own.append(item)
+        return own, other
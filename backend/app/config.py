@@ -1,3 +1,5 @@
+from functools import cached_property, lru_cache
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,32 +8,49 @@ class Settings(BaseSettings):
     openai_api_key: str = Field(default="", validation_alias="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o-mini", validation_alias="OPENAI_MODEL")
     openai_timeout: int = Field(default=120, validation_alias="OPENAI_TIMEOUT")
+    llm_cache_ttl: int = Field(default=3600, validation_alias="LLM_CACHE_TTL")
+    llm_cache_max_entries: int = Field(default=512, validation_alias="LLM_CACHE_MAX_ENTRIES")
+    node_cache_ttl: int = Field(default=900, validation_alias="NODE_CACHE_TTL")
     tavily_api_key: str = Field(default="", validation_alias="TAVILY_API_KEY")
     tavily_search_timeout: int = Field(default=10, validation_alias="TAVILY_SEARCH_TIMEOUT")
     tavily_extract_timeout: int = Field(default=30, validation_alias="TAVILY_EXTRACT_TIMEOUT")
+    http_max_connections: int = Field(default=100, validation_alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(
+        default=50, validation_alias="HTTP_MAX_KEEPALIVE_CONNECTIONS"
+    )
     mongodb_uri: str = Field(default="", validation_alias="MONGODB_URI")
     db_name: str = Field(default="travel_planner", validation_alias="DB_NAME")
+    mongo_pool_max: int = Field(default=50, validation_alias="MONGO_POOL_MAX")
+    mongo_pool_min: int = Field(default=4, validation_alias="MONGO_POOL_MIN")
+    run_events_ttl_days: int = Field(default=7, validation_alias="RUN_EVENTS_TTL_DAYS")
+    mongo_compressors: str = Field(default="zstd,zlib", validation_alias="MONGO_COMPRESSORS")
     cors_origins: str = Field(
         default="http://localhost:3000", validation_alias="CORS_ORIGINS"
     )
 
+    max_concurrent_runs: int = Field(default=8, validation_alias="MAX_CONCURRENT_RUNS")
     agent_search_timeout: int = Field(default=50, validation_alias="AGENT_SEARCH_TIMEOUT")
     agent_transport_timeout: int = Field(default=60, validation_alias="AGENT_TRANSPORT_TIMEOUT")
     agent_budget_timeout: int = Field(default=30, validation_alias="AGENT_BUDGET_TIMEOUT")
     agent_enrich_timeout: int = Field(default=120, validation_alias="AGENT_ENRICH_TIMEOUT")
+    agent_normalize_timeout: int = Field(default=40, validation_alias="AGENT_NORMALIZE_TIMEOUT")
     
     tavily_max_results: int = Field(default=8, validation_alias="TAVILY_MAX_RESULTS")
     tavily_call_cap: int = Field(default=3, validation_alias="TAVILY_CALL_CAP")
     search_top_n: int = Field(default=12, validation_alias="SEARCH_TOP_N")
     normalize_chunk_size: int = Field(default=4, validation_alias="NORMALIZE_CHUNK_SIZE")
+    normalize_max_tokens: int = Field(default=12000, validation_alias="NORMALIZE_MAX_TOKENS")
+    min_llm_items: int = Field(default=1, validation_alias="MIN_LLM_ITEMS")
     enrich_max_items_per_pass: int = Field(default=25, validation_alias="ENRICH_MAX_ITEMS_PER_PASS")
 
-    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
 
+    @cached_property
     def parsed_cors_origins(self) -> list[str]:
         parts = [p.strip() for p in self.cors_origins.split(",")]
         return [p for p in parts if p]
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     return Settings()
@@ -0,0 +1,174 @@
+import asyncio
+import contextlib
+import logging
+from typing import Any
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.write_concern import WriteConcern
+
+from app.db.mongo import MongoService, utc_now
+
+logger = logging.getLogger(__name__)
+
+
+class MongoEventBatcher:
+    """Buffers run telemetry and writes it with one ``bulk_write`` per collection.
+
+    Node events, ``progress.nodes`` updates, node end logs and small artifacts are queued
+    synchronously (ids and timestamps are assigned at enqueue time, so the SSE
+    ordering by ``(ts, _id)`` is unchanged) and flushed by a background task
+    ``flush_interval`` seconds after the first queued write, or as soon as
+    ``max_batch`` writes are pending. Progress updates for the same run are
+    folded into a single ``$set`` per flush.
+
+    Background flushes send event inserts unacknowledged (``w=0``): events are
+    append-only and ordered by ``(ts, _id)``, so the loop never waits on the
+    server for them. ``progress.nodes`` patches and artifacts are always
+    acknowledged; flushes hold a lock while writing, so a node's "start" patch
+    cannot land after its "end" and no artifact is dropped silently. Run state
+    (``status``, results, errors) must never be queued here; it goes through
+    ``MongoService.update_run``.
+    """
+
+    def __init__(
+        self,
+        mongo: MongoService,
+        *,
+        flush_interval: float = 0.02,
+        max_batch: int = 32,
+    ) -> None:
+        self.mongo = mongo
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._events: list[dict[str, Any]] = []
+        self._artifacts: list[InsertOne | UpdateOne] = []
+        self._progress: dict[str, dict[str, Any]] = {}
+        self._pending = 0
+        self._wake = asyncio.Event()
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._unacked_events = mongo.run_events.with_options(write_concern=WriteConcern(w=0))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    def add_event(
+        self,
+        run_id: str,
+        *,
+        type: str,
+        node: str | None = None,
+        payload: dict[str, Any] | None = None,
+    ) -> None:
+        self._events.append(
+            MongoService._event_doc(run_id, type=type, node=node, payload=payload)
+        )
+        self._queued(1)
+
+    def set_node_progress(self, run_id: str, *, node: str, payload: dict[str, Any]) -> None:
+        MongoService._check_node_name(node)
+        patch = self._progress.setdefault(run_id, {})
+        patch[f"progress.nodes.{node}"] = payload
+        patch["updatedAt"] = utc_now()
+        self._queued(1)
+
+    def add_node_end_log(
+        self,
+        run_id: str,
+        *,
+        node: str,
+        input: Any,
+        output: Any,
+        error: dict[str, Any] | None = None,
+    ) -> None:
+        artifact_docs, event = MongoService.node_end_log_docs(
+            run_id, node=node, input=input, output=output, error=error
+        )
+        self._artifacts.extend(InsertOne(d) for d in artifact_docs)
+        self._events.append(event)
+        self._queued(len(artifact_docs) + 1)
+
+    def add_artifact(
+        self,
+        run_id: str,
+        *,
+        type: str,
+        payload: dict[str, Any],
+        idempotent: bool = False,
+    ) -> None:
+        """Queue an artifact plus the ``artifact`` event that streams it over SSE.
+
+        ``idempotent`` upserts on ``(runId, type)`` like ``MongoService.add_artifact``.
+        """
+        now = utc_now()
+        doc = MongoService._artifact_doc(run_id, type=type, payload=payload, ts=now)
+        self._artifacts.append(
+            UpdateOne(*MongoService._artifact_upsert(doc), upsert=True)
+            if idempotent
+            else InsertOne(doc)
+        )
+        self._events.append(
+            MongoService._event_doc(
+                run_id, type="artifact", payload={"type": type, "payload": payload}, ts=now
+            )
+        )
+        self._queued(2)
+
+    def _queued(self, n: int) -> None:
+        self._pending += n
+        self._wake.set()
+        if self._pending >= self.max_batch:
+            self._full.set()
+
+    async def flush(self, *, acknowledged: bool = True) -> None:
+        """Write everything queued so far; failures are logged, not raised.
+
+        ``acknowledged=False`` only relaxes the event inserts.
+        """
+        events_coll = self.mongo.run_events if acknowledged else self._unacked_events
+        async with self._lock:
+            events, self._events = self._events, []
+            artifacts, self._artifacts = self._artifacts, []
+            progress, self._progress = self._progress, {}
+            self._pending = 0
+            self._full.clear()
+
+            writes = []
+            if events:
+                writes.append(
+                    events_coll.bulk_write([InsertOne(d) for d in events], ordered=False)
+                )
+            if artifacts:
+                writes.append(
+                    self.mongo.artifacts.bulk_write(artifacts, ordered=False)
+                )
+            if progress:
+                writes.append(
+                    self.mongo.runs.bulk_write(
+                        [UpdateOne({"_id": rid}, {"$set": patch}) for rid, patch in progress.items()],
+                        ordered=False,
+                    )
+                )
+            if not writes:
+                return
+            for result in await asyncio.gather(*writes, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.warning("Event batch write failed: %s", result)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wake.wait()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            self._wake.clear()
+            await self.flush(acknowledged=False)
@@ -1,19 +1,69 @@
+import asyncio
 from datetime import datetime, timezone
 from typing import Any
 
+import orjson
+from bson import Binary, ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    from backports import zstd  # installed by pymongo[zstd]
 
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# Artifact payloads whose JSON exceeds this many bytes are stored zstd-compressed
+# as ``{"_z": Binary}``; smaller ones stay queryable subdocuments.
+PAYLOAD_COMPRESS_MIN_BYTES = 4096
+_ZSTD_LEVEL = 3
+
+
+def pack_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    try:
+        raw = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        # Not JSON-representable (e.g. an ObjectId inside); let BSON store it as is.
+        return payload
+    if len(raw) < PAYLOAD_COMPRESS_MIN_BYTES:
+        return payload
+    return {"_z": Binary(zstd.compress(raw, level=_ZSTD_LEVEL))}
+
+
+def unpack_payload(payload: dict[str, Any] | None) -> dict[str, Any]:
+    if payload and "_z" in payload:
+        return orjson.loads(zstd.decompress(payload["_z"]))
+    return payload or {}
+
+
 class MongoService:
-    def __init__(self, mongodb_uri: str, db_name: str) -> None:
+    def __init__(
+        self,
+        mongodb_uri: str,
+        db_name: str,
+        *,
+        max_pool_size: int = 50,
+        min_pool_size: int = 4,
+        compressors: str = "zstd,zlib",
+    ) -> None:
         if not mongodb_uri:
             raise ValueError("MONGODB_URI is required")
-        self.client = AsyncIOMotorClient(mongodb_uri, serverSelectionTimeoutMS=5000)
+        # Compressors whose libraries are not installed are skipped by the
+        # driver; the server picks the first one both sides support.
+        self.client = AsyncIOMotorClient(
+            mongodb_uri,
+            serverSelectionTimeoutMS=5000,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            retryWrites=True,
+            compressors=compressors,
+            uuidRepresentation="standard",
+        )
         self.db = self.client[db_name]
         self.runs = self.db["runs"]
         self.run_events = self.db["run_events"]
@@ -25,15 +75,44 @@ class MongoService:
     async def ping(self) -> None:
         await self.client.admin.command("ping")
 
-    async def ensure_indexes(self) -> None:
-        await self.runs.create_index([("updatedAt", ASCENDING)])
-        await self.runs.create_index([("status", ASCENDING), ("updatedAt", ASCENDING)])
-        await self.run_events.create_index(
-            [("runId", ASCENDING), ("ts", ASCENDING), ("_id", ASCENDING)]
-        )
-        await self.artifacts.create_index(
-            [("runId", ASCENDING), ("ts", ASCENDING), ("_id", ASCENDING)]
+    async def ensure_indexes(self, *, events_ttl_seconds: int = 7 * 24 * 3600) -> None:
+        """One createIndexes command per collection, issued concurrently."""
+        await asyncio.gather(
+            self.runs.create_indexes(
+                [
+                    IndexModel([("updatedAt", ASCENDING)]),
+                    IndexModel([("status", ASCENDING), ("updatedAt", ASCENDING)]),
+                ]
+            ),
+            self.run_events.create_indexes(
+                [IndexModel([("runId", ASCENDING), ("ts", ASCENDING), ("_id", ASCENDING)])]
+            ),
+            self.artifacts.create_indexes(
+                [
+                    IndexModel([("runId", ASCENDING), ("ts", ASCENDING), ("_id", ASCENDING)]),
+                    IndexModel([("runId", ASCENDING), ("type", ASCENDING), ("ts", DESCENDING)]),
+                ]
+            ),
         )
+        if events_ttl_seconds > 0:
+            await self._ensure_events_ttl(events_ttl_seconds)
+
+    async def _ensure_events_ttl(self, seconds: int) -> None:
+        """Expire run events ``seconds`` after their ``ts``; retunes an existing TTL index."""
+        # Kept out of the batch above: an options conflict here must not fail the others.
+        try:
+            await self.run_events.create_index(
+                [("ts", ASCENDING)], name="ts_ttl", expireAfterSeconds=seconds
+            )
+        except OperationFailure as e:
+            if e.code not in (85, 86):  # IndexOptionsConflict / IndexKeySpecsConflict
+                raise
+            await self.db.command(
+                {
+                    "collMod": self.run_events.name,
+                    "index": {"name": "ts_ttl", "expireAfterSeconds": seconds},
+                }
+            )
 
     async def create_run(
         self,
@@ -41,12 +120,15 @@ class MongoService:
         *,
         constraints: dict[str, Any] | None,
         options: dict[str, Any],
+        progress: dict[str, dict[str, Any]] | None = None,
     ) -> None:
+        """Insert a queued run; ``progress`` seeds ``progress.nodes`` in the same write."""
+        now = utc_now()
         doc = {
             "_id": run_id,
             "status": "queued",
-            "createdAt": utc_now(),
-            "updatedAt": utc_now(),
+            "createdAt": now,
+            "updatedAt": now,
             "options": options,
             "constraints": constraints,
             "warnings": [],
@@ -55,15 +137,50 @@ class MongoService:
             "runType": "spot_on",
             "apiVersion": 2,
         }
+        if progress:
+            for node in progress:
+                self._check_node_name(node)
+            doc["progress"] = {"nodes": dict(progress)}
         await self.runs.insert_one(doc)
 
-    async def update_run(self, run_id: str, patch: dict[str, Any]) -> None:
+    async def update_run(
+        self,
+        run_id: str,
+        patch: dict[str, Any],
+        *,
+        progress: dict[str, dict[str, Any]] | None = None,
+    ) -> None:
+        """Apply ``patch`` plus any per-node ``progress`` in a single update."""
         patch = dict(patch)
+        for node, payload in (progress or {}).items():
+            self._check_node_name(node)
+            patch[f"progress.nodes.{node}"] = payload
         patch["updatedAt"] = utc_now()
         await self.runs.update_one({"_id": run_id}, {"$set": patch})
 
-    async def get_run(self, run_id: str) -> dict[str, Any] | None:
-        return await self.runs.find_one({"_id": run_id})
+    @staticmethod
+    def _check_node_name(node: str) -> None:
+        if "." in node or node.startswith("$"):
+            raise ValueError("Invalid node name")
+
+    async def get_run(
+        self, run_id: str, *, projection: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
+        return await self.runs.find_one({"_id": run_id}, projection=projection)
+
+    async def get_run_status(self, run_id: str) -> str | None:
+        """Just the run's status, without pulling final_output and progress over the wire."""
+        doc = await self.runs.find_one({"_id": run_id}, projection={"status": 1})
+        return doc.get("status") if doc else None
+
+    async def get_final_output(self, run_id: str) -> dict[str, Any] | None:
+        """Latest ``final_output`` artifact payload; the artifact is its system of record."""
+        doc = await self.artifacts.find_one(
+            {"runId": run_id, "type": "final_output"},
+            projection={"payload": 1},
+            sort=[("ts", DESCENDING), ("_id", DESCENDING)],
+        )
+        return unpack_payload((doc or {}).get("payload")).get("final_output")
 
     async def set_node_progress(
         self,
@@ -72,8 +189,7 @@ class MongoService:
         node: str,
         payload: dict[str, Any],
     ) -> None:
-        if "." in node or node.startswith("$"):
-            raise ValueError("Invalid node name")
+        self._check_node_name(node)
         patch: dict[str, Any] = {f"progress.nodes.{node}": payload, "updatedAt": utc_now()}
         await self.runs.update_one({"_id": run_id}, {"$set": patch})
 
@@ -86,70 +202,152 @@ class MongoService:
         payload: dict[str, Any] | None = None,
         ts: datetime | None = None,
     ) -> None:
-        doc = {
+        await self.run_events.insert_one(
+            self._event_doc(run_id, type=type, node=node, payload=payload, ts=ts)
+        )
+
+    @staticmethod
+    def _event_doc(
+        run_id: str,
+        *,
+        type: str,
+        node: str | None = None,
+        payload: dict[str, Any] | None = None,
+        ts: datetime | None = None,
+    ) -> dict[str, Any]:
+        return {
+            "_id": ObjectId(),
             "runId": run_id,
             "ts": ts or utc_now(),
             "type": type,
             "node": node,
             "payload": payload or {},
         }
-        await self.run_events.insert_one(doc)
 
-    async def add_artifact(
-        self,
+    @staticmethod
+    def _artifact_doc(
         run_id: str,
         *,
         type: str,
         payload: dict[str, Any],
         version: int = 1,
-        emit_event: bool = True,
-    ) -> Any:
-        doc = {
+        ts: datetime | None = None,
+    ) -> dict[str, Any]:
+        return {
+            "_id": ObjectId(),
             "runId": run_id,
-            "ts": utc_now(),
+            "ts": ts or utc_now(),
             "type": type,
-            "payload": payload,
+            "payload": pack_payload(payload),
             "version": version,
         }
-        res = await self.artifacts.insert_one(doc)
+
+    @staticmethod
+    def _artifact_upsert(doc: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Filter and update that store ``doc`` as its run's only artifact of that type."""
+        return (
+            {"runId": doc["runId"], "type": doc["type"]},
+            {
+                "$set": {"ts": doc["ts"], "payload": doc["payload"], "version": doc["version"]},
+                "$setOnInsert": {"_id": doc["_id"]},
+            },
+        )
+
+    async def add_artifact(
+        self,
+        run_id: str,
+        *,
+        type: str,
+        payload: dict[str, Any],
+        version: int = 1,
+        emit_event: bool = True,
+        idempotent: bool = False,
+    ) -> Any:
+        """Store an artifact; ``idempotent`` upserts on ``(runId, type)`` so a
+        re-executed run overwrites it instead of adding a duplicate (the
+        returned id is then the new document's, or None if one was updated)."""
+        now = utc_now()
+        doc = self._artifact_doc(run_id, type=type, payload=payload, version=version, ts=now)
+        if idempotent:
+            write = self.artifacts.update_one(*self._artifact_upsert(doc), upsert=True)
+        else:
+            write = self.artifacts.insert_one(doc)
         if emit_event:
-            await self.append_event(
-                run_id, type="artifact", payload={"type": type, "payload": payload}
+            # Ids are assigned client-side, so the artifact and its event can be written concurrently.
+            result, _ = await asyncio.gather(
+                write,
+                self.append_event(
+                    run_id, type="artifact", payload={"type": type, "payload": payload}, ts=now
+                ),
             )
-        return res.inserted_id
+        else:
+            result = await write
+        if idempotent:
+            return result.upserted_id
+        return doc["_id"]
 
-    async def append_node_end_log(
-        self,
+    @classmethod
+    def node_end_log_docs(
+        cls,
         run_id: str,
         *,
         node: str,
         input: Any,
         output: Any,
         error: dict[str, Any] | None = None,
-    ) -> None:
-        input_artifact_id = await self.add_artifact(
-            run_id,
-            type="node_input",
-            payload={"node": node, "input": input},
-            emit_event=False,
+    ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+        """The node_input/node_output artifacts and the log event pointing at them."""
+        now = utc_now()
+        input_doc = cls._artifact_doc(
+            run_id, type="node_input", payload={"node": node, "input": input}, ts=now
         )
-        output_artifact_id = await self.add_artifact(
-            run_id,
-            type="node_output",
-            payload={"node": node, "output": output},
-            emit_event=False,
+        output_doc = cls._artifact_doc(
+            run_id, type="node_output", payload={"node": node, "output": output}, ts=now
         )
 
         payload: dict[str, Any] = {
             "kind": "node_end_io",
             "node": node,
-            "input": {"artifactId": str(input_artifact_id), "type": "node_input"},
-            "output": {"artifactId": str(output_artifact_id), "type": "node_output"},
+            "input": {"artifactId": str(input_doc["_id"]), "type": "node_input"},
+            "output": {"artifactId": str(output_doc["_id"]), "type": "node_output"},
         }
         if error:
             payload["error"] = error
+        event = cls._event_doc(run_id, type="log", node=node, payload=payload, ts=now)
+        return [input_doc, output_doc], event
+
+    async def append_node_end_log(
+        self,
+        run_id: str,
+        *,
+        node: str,
+        input: Any,
+        output: Any,
+        error: dict[str, Any] | None = None,
+    ) -> None:
+        artifact_docs, event = self.node_end_log_docs(
+            run_id, node=node, input=input, output=output, error=error
+        )
+        await asyncio.gather(
+            self.artifacts.insert_many(artifact_docs, ordered=False),
+            self.run_events.insert_one(event),
+        )
 
-        await self.append_event(run_id, type="log", node=node, payload=payload)
+    def watch_events(self, run_id: str, *, max_await_time_ms: int = 1000) -> Any:
+        """Change stream of events inserted for one run (needs a replica set).
+
+        Use as ``async with mongo.watch_events(run_id) as stream``; ``try_next``
+        returns None after ``max_await_time_ms`` without new events.
+        """
+        pipeline = [
+            {"$match": {"operationType": "insert", "fullDocument.runId": run_id}},
+            {"$project": {"fullDocument": 1}},
+        ]
+        return self.run_events.watch(
+            pipeline,
+            full_document="default",
+            max_await_time_ms=max_await_time_ms,
+        )
 
     async def list_events_since_cursor(
         self,
@@ -30,6 +30,7 @@ class NodeEventPayload(BaseModel):
     status: NodeStatus
     message: str | None = None
     error: str | None = None
+    durationMs: int | None = None
 
 
 class RunProgress(BaseModel):
@@ -1,10 +1,14 @@
+import asyncio
+import copy
+import functools
 import logging
+import time
 from typing import Any, Callable, Coroutine
 
 from langgraph.graph import END, StateGraph
 
 from app.agents.attractions import AttractionsAgent
-from app.agents.enrichment import EnrichmentAgent
+from app.agents.enrichment import STATE_KEYS, EnrichmentAgent
 from app.agents.hotel import HotelAgent
 from app.agents.budget import BudgetAgent
 from app.agents.restaurant import RestaurantAgent
@@ -12,79 +16,145 @@ from app.agents.transport import TransportAgent
 from app.graph.nodes.parse import parse_request
 from app.graph.nodes.quality_split import quality_split
 from app.graph.state import SpotOnState
+from app.utils.ids import current_run_id
+from app.utils.llm_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
 
-def build_graph(deps: Any):
-    graph = StateGraph(SpotOnState)
-    restaurant_agent = RestaurantAgent("restaurant_agent", deps)
-    attractions_agent = AttractionsAgent("attractions_agent", deps)
-    hotel_agent = HotelAgent("hotel_agent", deps)
-    transport_agent = TransportAgent("transport_agent", deps)
-    enrichment_agent = EnrichmentAgent("enrichment_agent", deps)
-    budget_agent = BudgetAgent("budget_agent", deps)
+# Small state fields recorded as a node's input in its end log; the search
+# results and category lists are deliberately left out.
+_LOGGABLE_KEYS = ("runId", "status", "agent_statuses", "skip_enrichment", "enrichment_loop_count")
+
+
+# A node's "start" event is only written if it is still running after this
+# many seconds; quicker nodes produce a single terminal event carrying durationMs.
+NODE_START_EVENT_DELAY = 0.5
+
+
+# Domain agents only read query_context (derived from the constraints), so
+# their output can be reused for an identical trip while the cache TTL holds.
+_DOMAIN_CACHE_KEYS = ("query_context",)
+
+# EnrichAgent's inputs: the destination, the items it scans for gaps, and any
+# enrichment already collected. Identical item lists reuse the earlier patches.
+_ENRICH_CACHE_KEYS = ("query_context", *STATE_KEYS.values(), "enriched_data")
+
+
+def _merge_updates(updates: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine sibling node updates the way SpotOnState's reducers would."""
+    merged: dict[str, Any] = {"agent_statuses": {}, "warnings": []}
+    for out in updates:
+        for key, value in (out or {}).items():
+            if key == "agent_statuses":
+                merged[key] |= value or {}
+            elif key == "warnings":
+                merged[key] += value or []
+            else:
+                merged[key] = value
+    return merged
+
+
+# Node telemetry is queued and bulk-written by the app's MongoEventBatcher.
+# Payloads are shared read-only templates (see _wrap) or fresh copies of one.
+def _emit_node_event(deps: Any, run_id: str, payload: dict[str, Any]) -> None:
+    node = payload["node"]
+    deps.event_batcher.add_event(run_id, type="node", node=node, payload=payload)
+    deps.event_batcher.set_node_progress(run_id, node=node, payload=payload)
+
+
+def _emit_run_log(
+    deps: Any,
+    run_id: str,
+    *,
+    node: str,
+    input: dict[str, Any],
+    output: dict[str, Any],
+    error: dict[str, Any] | None = None,
+) -> None:
+    deps.event_batcher.add_node_end_log(
+        run_id,
+        node=node,
+        input=input,
+        output=output,
+        error=error,
+    )
 
-    async def _emit_node_event(
-        run_id: str,
-        *,
-        node: str,
-        status: str,
-        message: str,
-        error: str | None = None,
-    ) -> None:
-        payload: dict[str, Any] = {"node": node, "status": status, "message": message}
-        if error:
-            payload["error"] = error
-        await deps.mongo.append_event(run_id, type="node", node=node, payload=payload)
-        await deps.mongo.set_node_progress(run_id, node=node, payload=payload)
-
-    async def _emit_run_log(
-        run_id: str,
-        *,
-        node: str,
-        input: dict[str, Any],
-        output: dict[str, Any],
-        error: dict[str, Any] | None = None,
-    ) -> None:
-        await deps.mongo.append_node_end_log(
-            run_id,
-            node=node,
-            input=input,
-            output=output,
-            error=error,
-        )
 
-    def _wrap(
-        name: str,
-        fn: Callable[..., Coroutine[Any, Any, dict[str, Any]]],
-        *,
-        pass_deps_kwarg: bool,
-    ):
-        async def _inner(state: dict[str, Any]) -> dict[str, Any]:
-            run_id = state.get("runId")
-            logger.info("Graph node start: %s (runId=%s)", name, run_id or "-")
-            node_input: dict[str, Any] = {
-                "runId": state.get("runId"),
-                "status": state.get("status"),
-                "agent_statuses": state.get("agent_statuses"),
-            }
+def _wrap(
+    deps: Any,
+    name: str,
+    fn: Callable[..., Coroutine[Any, Any, dict[str, Any]]],
+    *,
+    pass_deps_kwarg: bool,
+    cache_on: tuple[str, ...] = (),
+    full_telemetry: bool = True,
+) -> Callable[[dict[str, Any]], Coroutine[Any, Any, dict[str, Any]]]:
+    """Graph node running ``fn`` with start/end/error telemetry for ``name``.
+
+    With ``cache_on``, a successful output is reused (via ``deps.node_cache``)
+    for later runs whose state matches on those keys. The start event is
+    deferred by ``NODE_START_EVENT_DELAY`` and dropped if the node finishes
+    first. ``full_telemetry=False`` (cheap pure-logic nodes) skips the start
+    event and the success end log, keeping the end/error events the
+    frontend's progress list needs.
+    """
+    # Bound once here rather than re-decided on every invocation.
+    call = functools.partial(fn, deps=deps) if pass_deps_kwarg else fn
+    cache = getattr(deps, "node_cache", None) if cache_on else None
+    # Node event payloads, built once per node; durationMs/error are added per call.
+    start_payload = {"node": name, "status": "start", "message": f"{name} started"}
+    cached_payload = {"node": name, "status": "end", "message": f"{name} finished (cached)"}
+    end_payload = {"node": name, "status": "end", "message": f"{name} finished"}
+    error_payload = {"node": name, "status": "error", "message": f"{name} error"}
+
+    async def _inner(state: dict[str, Any]) -> dict[str, Any]:
+        # State lookup only for graphs invoked outside _execute_run.
+        run_id = current_run_id.get() or state.get("runId")
+        t0 = time.perf_counter_ns()
+        logger.debug("Graph node start: %s (runId=%s)", name, run_id or "-")
+        trace = bool(run_id) and full_telemetry
+        node_input = {k: state.get(k) for k in _LOGGABLE_KEYS if k in state} if trace else None
+
+        start_event = (
+            asyncio.get_running_loop().call_later(
+                NODE_START_EVENT_DELAY, _emit_node_event, deps, run_id, start_payload
+            )
+            if trace
+            else None
+        )
 
+        cache_key = LLMCache.key(name, [state.get(k) for k in cache_on]) if cache else None
+        if cache_key and (cached := await cache.get(cache_key)) is not None:
+            logger.info("Graph node cache hit: %s (runId=%s)", name, run_id or "-")
+            if start_event:
+                start_event.cancel()
             if run_id:
-                await _emit_node_event(
-                    run_id,
-                    node=name,
-                    status="start",
-                    message=f"{name} started",
+                _emit_node_event(deps, run_id, cached_payload)
+            return copy.deepcopy(cached)
+
+        try:
+            out = await call(state)
+            if start_event:
+                start_event.cancel()
+            duration_ms = (time.perf_counter_ns() - t0) // 1_000_000
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Graph node end: %s (runId=%s, %dms)",
+                    name,
+                    run_id or "-",
+                    duration_ms,
+                    extra={"node": name, "run_id": run_id, "duration_ms": duration_ms},
                 )
 
-            try:
-                out = await (fn(state, deps=deps) if pass_deps_kwarg else fn(state))
-                logger.info("Graph node end: %s (runId=%s)", name, run_id or "-")
+            if cache_key and "failed" not in (out.get("agent_statuses") or {}).values():
+                await cache.set(cache_key, copy.deepcopy(out))
 
-                if run_id:
+            if run_id:
+                if trace:
                     try:
-                        await _emit_run_log(
+                        _emit_run_log(
+                            deps,
                             run_id,
                             node=name,
                             input=node_input,
@@ -98,102 +168,118 @@ def build_graph(deps: Any):
                             exc_info=True,
                         )
 
-                    await _emit_node_event(
+                _emit_node_event(deps, run_id, end_payload | {"durationMs": duration_ms})
+
+            return out
+
+        except Exception as e:
+            if start_event:
+                start_event.cancel()
+            error = {"message": str(e), "type": type(e).__name__}
+            duration_ms = (time.perf_counter_ns() - t0) // 1_000_000
+            logger.exception(
+                "Graph node error: %s (runId=%s, %dms, error=%s)",
+                name,
+                run_id or "-",
+                duration_ms,
+                error["message"] or error["type"],
+                extra={
+                    "node": name,
+                    "run_id": run_id,
+                    "duration_ms": duration_ms,
+                    "error_type": error["type"],
+                },
+            )
+
+            if run_id:
+                try:
+                    _emit_run_log(
+                        deps,
                         run_id,
                         node=name,
-                        status="end",
-                        message=f"{name} finished",
+                        input=node_input,
+                        output={"error": error},
+                        error=error,
+                    )
+                except Exception:
+                    logger.debug(
+                        "Failed to emit node end log (error): %s (runId=%s)",
+                        name,
+                        run_id,
+                        exc_info=True,
                     )
 
-                    if name == "ParseRequest" and out.get("constraints"):
-                        await deps.mongo.add_artifact(
-                            run_id,
-                            type="constraints",
-                            payload={"constraints": out.get("constraints")},
-                        )
+                payload = error_payload | {"durationMs": duration_ms}
+                if error["message"]:
+                    payload["error"] = error["message"]
+                _emit_node_event(deps, run_id, payload)
+            return {
+                "agent_statuses": {name: "failed"},
+                "warnings": [f"{name} failed: {error['message']}"],
+            }
 
-                return out
+    return _inner
 
-            except Exception as e:
-                logger.exception("Node failed: %s", name)
-                logger.error(
-                    "Graph node error: %s (runId=%s, error=%s)",
-                    name,
-                    run_id or "-",
-                    str(e) or type(e).__name__,
-                )
 
-                if run_id:
-                    try:
-                        await _emit_run_log(
-                            run_id,
-                            node=name,
-                            input=node_input,
-                            output={
-                                "error": {"message": str(e), "type": type(e).__name__}
-                            },
-                            error={"message": str(e), "type": type(e).__name__},
-                        )
-                    except Exception:
-                        logger.debug(
-                            "Failed to emit node end log (error): %s (runId=%s)",
-                            name,
-                            run_id,
-                            exc_info=True,
-                        )
+def domain_router(state: dict[str, Any]) -> str:
+    if state.get("skip_enrichment"):
+        return "QualitySplit"
+    return "EnrichAgent"
 
-                    await _emit_node_event(
-                        run_id,
-                        node=name,
-                        status="error",
-                        message=f"{name} error",
-                        error=str(e),
-                    )
-                return {
-                    "agent_statuses": {name: "failed"},
-                    "warnings": [f"{name} failed: {e}"],
-                }
 
-        return _inner
+def build_graph(deps: Any):
+    graph = StateGraph(SpotOnState)
+    restaurant_agent = RestaurantAgent("restaurant_agent", deps)
+    attractions_agent = AttractionsAgent("attractions_agent", deps)
+    hotel_agent = HotelAgent("hotel_agent", deps)
+    transport_agent = TransportAgent("transport_agent", deps)
+    enrichment_agent = EnrichmentAgent("enrichment_agent", deps)
+    budget_agent = BudgetAgent("budget_agent", deps)
 
     # =========================================================================
     # NODES
     # =========================================================================
-    graph.add_node("ParseRequest", _wrap("ParseRequest", parse_request, pass_deps_kwarg=True))
+    graph.add_node("ParseRequest", _wrap(deps, "ParseRequest", parse_request, pass_deps_kwarg=True))
+
+    # Domain agents: awaited together inside one node so they are guaranteed to
+    # overlap; each keeps its own _wrap, so per-agent node events are unchanged.
+    domain_agents = [
+        _wrap(deps, name, agent.execute, pass_deps_kwarg=False, cache_on=_DOMAIN_CACHE_KEYS)
+        for name, agent in (
+            ("RestaurantAgent", restaurant_agent),
+            ("AttractionsAgent", attractions_agent),
+            ("HotelAgent", hotel_agent),
+            ("TransportAgent", transport_agent),
+        )
+    ]
 
-    # Domain agents
-    graph.add_node(
-        "RestaurantAgent",
-        _wrap("RestaurantAgent", restaurant_agent.execute, pass_deps_kwarg=False),
-    )
-    graph.add_node(
-        "AttractionsAgent",
-        _wrap("AttractionsAgent", attractions_agent.execute, pass_deps_kwarg=False),
-    )
-    graph.add_node(
-        "HotelAgent", _wrap("HotelAgent", hotel_agent.execute, pass_deps_kwarg=False)
-    )
-    graph.add_node(
-        "TransportAgent",
-        _wrap("TransportAgent", transport_agent.execute, pass_deps_kwarg=False),
-    )
+    async def run_domain_agents(state: dict[str, Any]) -> dict[str, Any]:
+        return _merge_updates(await asyncio.gather(*(run(state) for run in domain_agents)))
+
+    graph.add_node("DomainAgents", run_domain_agents)
 
     # EnrichAgent
     graph.add_node(
         "EnrichAgent",
-        _wrap("EnrichAgent", enrichment_agent.execute, pass_deps_kwarg=False),
+        _wrap(
+            deps,
+            "EnrichAgent",
+            enrichment_agent.execute,
+            pass_deps_kwarg=False,
+            cache_on=_ENRICH_CACHE_KEYS,
+        ),
     )
 
     # QualitySplit
     graph.add_node(
         "QualitySplit",
-        _wrap("QualitySplit", quality_split, pass_deps_kwarg=True),
+        _wrap(deps, "QualitySplit", quality_split, pass_deps_kwarg=True, full_telemetry=False),
     )
 
     # BudgetAgent
     graph.add_node(
         "BudgetAgent",
-        _wrap("BudgetAgent", budget_agent.execute, pass_deps_kwarg=False),
+        _wrap(deps, "BudgetAgent", budget_agent.execute, pass_deps_kwarg=False),
     )
 
     # =========================================================================
@@ -202,47 +288,16 @@ def build_graph(deps: Any):
 
     graph.set_entry_point("ParseRequest")
 
-    # Parallel fan-out: All 4 domain agents start after ParseRequest
-    graph.add_edge("ParseRequest", "RestaurantAgent")
-    graph.add_edge("ParseRequest", "AttractionsAgent")
-    graph.add_edge("ParseRequest", "HotelAgent")
-    graph.add_edge("ParseRequest", "TransportAgent")
+    graph.add_edge("ParseRequest", "DomainAgents")
 
-    # Join: all 4 domain agents → enrichment or skip to QualitySplit
-    def domain_router(state: dict[str, Any]) -> str:
-        if state.get("skip_enrichment"):
-            return "QualitySplit"
-        return "EnrichAgent"
-
-    graph.add_conditional_edges("RestaurantAgent", domain_router, {
-        "EnrichAgent": "EnrichAgent",
-        "QualitySplit": "QualitySplit",
-    })
-    graph.add_conditional_edges("AttractionsAgent", domain_router, {
-        "EnrichAgent": "EnrichAgent",
-        "QualitySplit": "QualitySplit",
-    })
-    graph.add_conditional_edges("HotelAgent", domain_router, {
-        "EnrichAgent": "EnrichAgent",
-        "QualitySplit": "QualitySplit",
-    })
-    graph.add_conditional_edges("TransportAgent", domain_router, {
+    # Domain agents → enrichment or skip to QualitySplit
+    graph.add_conditional_edges("DomainAgents", domain_router, {
         "EnrichAgent": "EnrichAgent",
         "QualitySplit": "QualitySplit",
     })
 
-    # Conditional edge 2: enrichment quality loop
-    def enrichment_router(state: dict[str, Any]) -> str:
-        ratio = state.get("enrichment_gap_ratio", 0.0)
-        loops = state.get("enrichment_loop_count", 0)
-        if ratio > 0.5 and loops < 2:
-            return "EnrichAgent"
-        return "QualitySplit"
-
-    graph.add_conditional_edges("EnrichAgent", enrichment_router, {
-        "EnrichAgent": "EnrichAgent",
-        "QualitySplit": "QualitySplit",
-    })
+    # EnrichAgent covers its gap batches concurrently in a single pass
+    graph.add_edge("EnrichAgent", "QualitySplit")
 
     # QualitySplit → BudgetAgent → END
     graph.add_edge("QualitySplit", "BudgetAgent")
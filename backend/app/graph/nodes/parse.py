@@ -5,6 +5,7 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.agents.prompt import build_location_normalization_prompt
 from app.schemas.spot_on import LocationNormalization, QueryContext, TravelConstraints
+from app.utils.ids import current_run_id
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +45,15 @@ async def parse_request(state: dict[str, Any], *, deps: Any) -> dict[str, Any]:
         extra={"run_id": state.get("runId")},
     )
 
+    validated = constraints.model_dump()
+    run_id = current_run_id.get() or state.get("runId")
+    batcher = getattr(deps, "event_batcher", None)
+    if run_id and batcher is not None:
+        batcher.add_artifact(
+            run_id, type="constraints", payload={"constraints": validated}, idempotent=True
+        )
+
     return {
-        "constraints": constraints.model_dump(),
+        "constraints": validated,
         "query_context": {**ctx.model_dump(), **state.get("preferences", {})},
     }
@@ -1,6 +1,8 @@
 import logging
 from typing import Any
 
+from app.utils.dedup import canonicalize_url
+
 logger = logging.getLogger(__name__)
 
 # Tier 1: ALWAYS required for main results
@@ -26,78 +28,89 @@ NAME_FIELD_MAP: dict[str, str] = {
     "flights": "route",
 }
 
+_CATEGORY_NAMES: tuple[str, ...] = (
+    "restaurants",
+    "travel_spots",
+    "hotels",
+    "car_rentals",
+    "flights",
+)
+
+SECTION_MAP: dict[str, str] = {
+    "restaurants": "restaurant",
+    "travel_spots": "attraction",
+    "hotels": "hotel",
+    "car_rentals": "car",
+    "flights": "flight",
+}
 
-def _merge_enriched(
-    items: list[dict[str, Any]], enriched: dict[str, dict[str, Any]]
-) -> list[dict[str, Any]]:
-    merged: list[dict[str, Any]] = []
-    for it in items:
-        extra = enriched.get(it.get("id", ""), {})
-        if not extra:
-            merged.append(it)
-            continue
-        out = dict(it)
-        for k, v in extra.items():
-            if k not in out or out[k] in (None, "", [], {}):
-                out[k] = v
-        merged.append(out)
-    return merged
 
+# Field values that count as missing. A module constant: the literal tuple holds
+# a list and a dict, so writing it inline rebuilds it on every membership test.
+_EMPTY: tuple[Any, ...] = (None, "", [], {})
+
+# Per category: (critical fields with the name field resolved, important fields).
+_REQUIRED: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    cat: (
+        tuple(NAME_FIELD_MAP.get(cat, "name") if f == "name" else f for f in CRITICAL_FIELDS.get(cat, [])),
+        tuple(IMPORTANT_FIELDS.get(cat, [])),
+    )
+    for cat in _CATEGORY_NAMES
+}
 
-def _has_required(item: dict[str, Any], category: str) -> bool:
-    name_field = NAME_FIELD_MAP.get(category, "name")
 
-    critical = CRITICAL_FIELDS.get(category, [])
-    for field in critical:
-        actual_field = name_field if field == "name" else field
-        val = item.get(actual_field)
-        if val in (None, "", [], {}):
-            return False
+def _apply_enrichment(item: dict[str, Any], extra: dict[str, Any]) -> dict[str, Any]:
+    """``item`` with its empty fields filled from ``extra``.
 
-    important = IMPORTANT_FIELDS.get(category, [])
-    if not important:
-        return True
+    Returns ``item`` itself when ``extra`` fills nothing, otherwise a new dict.
+    """
+    get = item.get
+    fill = {k: v for k, v in extra.items() if get(k) in _EMPTY}
+    return {**item, **fill} if fill else item
 
-    for field in important:
-        val = item.get(field)
-        if val not in (None, "", [], {}):
-            return True
 
-    return False
+def _has_required(item: dict[str, Any], category: str) -> bool:
+    critical, important = _REQUIRED.get(category, ((), ()))
+    get = item.get
+    if any(get(field) in _EMPTY for field in critical):
+        return False
+    return not important or any(get(field) not in _EMPTY for field in important)
 
 
 async def quality_split(state: dict[str, Any], *, deps: Any) -> dict[str, Any]:
     enriched = state.get("enriched_data", {})
-    categories = ["restaurants", "travel_spots", "hotels", "car_rentals", "flights"]
 
     main_results: dict[str, list[dict[str, Any]]] = {}
     demoted_refs: list[dict[str, Any]] = []
+    main_urls: set[str] = set()
 
-    for cat in categories:
-        items = _merge_enriched(state.get(cat, []), enriched)
+    get_extra = enriched.get
+    for cat in _CATEGORY_NAMES:
+        section = SECTION_MAP.get(cat, cat)
+        name_field = NAME_FIELD_MAP.get(cat, "name")
         main: list[dict[str, Any]] = []
-        for item in items:
+        for it in state.get(cat, ()):
+            extra = get_extra(it.get("id", ""))
+            item = _apply_enrichment(it, extra) if extra else it
             if _has_required(item, cat):
                 main.append(item)
-            else:
-                section_map = {
-                    "restaurants": "restaurant",
-                    "travel_spots": "attraction",
-                    "hotels": "hotel",
-                    "car_rentals": "car",
-                    "flights": "flight",
-                }
-                name_field = NAME_FIELD_MAP.get(cat, "name")
-                demoted_refs.append({
-                    **item,
-                    "section": section_map.get(cat, cat),
-                    "title": item.get(name_field) or item.get("name") or "Source",
-                    "content": item.get("snippet") or item.get("why_recommended") or "",
-                })
+                main_urls.add(canonicalize_url(item["url"]))
+                continue
+            # Enriched items are already private copies; only shared state dicts need one.
+            ref = item if item is not it else dict(item)
+            ref["title"] = item.get(name_field) or item.get("name") or "Source"
+            ref["content"] = item.get("snippet") or item.get("why_recommended") or ""
+            ref["section"] = section
+            demoted_refs.append(ref)
         main_results[cat] = main
 
-    existing_refs = state.get("references", [])
-    all_refs = existing_refs + demoted_refs
+    # A source already shown as a main pick is not repeated as a reference.
+    all_refs = [
+        ref
+        for group in (state.get("references", []), demoted_refs)
+        for ref in group
+        if canonicalize_url(ref.get("url", "")) not in main_urls
+    ]
 
     total_main = sum(len(v) for v in main_results.values())
     total_demoted = len(demoted_refs)
@@ -109,7 +122,12 @@ async def quality_split(state: dict[str, Any], *, deps: Any) -> dict[str, Any]:
         extra={"run_id": state.get("runId")},
     )
 
+    # The per-category lists and enrichment patches are folded into main_results
+    # and references above; clear them so the rest of the run doesn't carry them.
+    cleared: dict[str, Any] = {cat: [] for cat in _CATEGORY_NAMES}
     return {
+        **cleared,
+        "enriched_data": {},
         "main_results": main_results,
         "references": all_refs,
     }
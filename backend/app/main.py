@@ -1,6 +1,9 @@
 import asyncio
 import collections
+import hashlib
 import logging
+import random
+from collections.abc import Callable
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from types import SimpleNamespace
@@ -8,19 +11,24 @@ from typing import Any
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pymongo.errors import PyMongoError
 
 from app.services.export import generate_pdf, generate_xlsx
 
 from app.config import Settings, get_settings
+from app.db.event_batcher import MongoEventBatcher
 from app.db.mongo import MongoService
 from app.db.schemas import RecommendRequest, RecommendResponse, RunCreateRequest, RunCreateResponse, RunGetResponse
 from app.graph.graph import build_graph
+from app.services.http import build_http_transport
 from app.services.llm import LLMService
 from app.services.tavily import TavilyService
-from app.utils.ids import new_run_id
-from app.utils.sse import sse_event
+from app.utils.ids import current_run_id, new_run_id
+from app.utils.export_cache import ExportCache
+from app.utils.llm_cache import LLMCache
+from app.utils.orjson_response import ORJSONResponse
+from app.utils.sse import SSE_KEEPALIVE, SSE_KEEPALIVE_INTERVAL, sse_event
 
 
 def create_app() -> FastAPI:
@@ -36,17 +44,42 @@ def create_app() -> FastAPI:
         deps = SimpleNamespace()
         deps.settings = settings
         deps.mongo = None
+        deps.event_batcher = None
         deps.llm = None
         deps.tavily = None
         deps.graph = None
+        deps.export_cache = ExportCache()
+        # Reuses domain agent outputs for identical trips; search results go
+        # stale, so this TTL is much shorter than the LLM response cache's.
+        deps.node_cache = (
+            LLMCache(ttl_seconds=settings.node_cache_ttl, max_entries=256)
+            if settings.node_cache_ttl > 0
+            else None
+        )
+        # Runs beyond this wait in "queued" until a slot frees up.
+        deps.run_slots = asyncio.Semaphore(settings.max_concurrent_runs)
+        deps.http_transport = build_http_transport(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+        )
 
         app.state.background_tasks = {}
 
         try:
             if settings.mongodb_uri:
-                deps.mongo = MongoService(settings.mongodb_uri, settings.db_name)
+                deps.mongo = MongoService(
+                    settings.mongodb_uri,
+                    settings.db_name,
+                    max_pool_size=settings.mongo_pool_max,
+                    min_pool_size=settings.mongo_pool_min,
+                    compressors=settings.mongo_compressors,
+                )
+                deps.event_batcher = MongoEventBatcher(deps.mongo)
+                deps.event_batcher.start()
                 await deps.mongo.ping()
-                await deps.mongo.ensure_indexes()
+                await deps.mongo.ensure_indexes(
+                    events_ttl_seconds=settings.run_events_ttl_days * 24 * 3600
+                )
         except Exception as e:
             logging.getLogger(__name__).error("Mongo init failed: %s", e)
 
@@ -55,7 +88,16 @@ def create_app() -> FastAPI:
                 deps.llm = LLMService(
                     settings.openai_api_key,
                     settings.openai_model,
-                    timeout_seconds=float(settings.openai_timeout)
+                    timeout_seconds=float(settings.openai_timeout),
+                    transport=deps.http_transport,
+                    cache=(
+                        LLMCache(
+                            ttl_seconds=settings.llm_cache_ttl,
+                            max_entries=settings.llm_cache_max_entries,
+                        )
+                        if settings.llm_cache_ttl > 0
+                        else None
+                    ),
                 )
         except Exception as e:
             logging.getLogger(__name__).error("OpenAI init failed: %s", e)
@@ -66,6 +108,7 @@ def create_app() -> FastAPI:
                     settings.tavily_api_key,
                     search_timeout_seconds=float(settings.tavily_search_timeout),
                     extract_timeout_seconds=float(settings.tavily_extract_timeout),
+                    transport=deps.http_transport,
                 )
         except Exception as e:
             logging.getLogger(__name__).error("Tavily init failed: %s", e)
@@ -83,16 +126,53 @@ def create_app() -> FastAPI:
                 t.cancel()
             if tasks:
                 await asyncio.gather(*tasks, return_exceptions=True)
+            if deps.event_batcher:
+                await deps.event_batcher.aclose()
             if getattr(deps, "mongo", None):
                 deps.mongo.close()
+            await deps.http_transport.aclose()
 
-    app = FastAPI(title="Travel Planner API", version="0.1.0", lifespan=lifespan)
+    app = FastAPI(
+        title="Travel Planner API",
+        version="0.1.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
 
     def _epoch() -> datetime:
         return datetime.fromtimestamp(0, tz=timezone.utc)
 
+    EXPORT_CACHE_CONTROL = "private, max-age=300"
+    # final_output is only inline on runs stored before it moved to the artifacts collection.
+    EXPORT_PROJECTION = {"status": 1, "updatedAt": 1, "constraints": 1, "final_output": 1}
+
+    def _export_etag(doc: dict[str, Any], fmt: str) -> str:
+        """Validator for a finished run's export; the doc no longer changes once done."""
+        updated = doc.get("updatedAt") or _epoch()
+        digest = hashlib.sha256(f"{doc.get('_id')}:{fmt}:{updated.isoformat()}".encode())
+        return f'"{digest.hexdigest()[:32]}"'
+
+    def _etag_matches(header: str, etag: str) -> bool:
+        """Weak If-None-Match comparison against a comma-separated list or ``*``."""
+        for tag in header.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == etag:
+                return True
+        return False
+
+    def _not_modified(request: Request, etag: str) -> Response | None:
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(
+                status_code=304,
+                headers={"ETag": etag, "Cache-Control": EXPORT_CACHE_CONTROL},
+            )
+        return None
+
     async def _execute_run(deps: Any, run_id: str) -> None:
+        # Runs in its own task, so this binding is private to the run.
+        current_run_id.set(run_id)
         mongo = getattr(deps, "mongo", None)
+        has_slot = False
         try:
             if not mongo:
                 raise RuntimeError("MongoDB not configured")
@@ -103,18 +183,13 @@ def create_app() -> FastAPI:
             if not getattr(deps, "graph", None):
                 raise RuntimeError("Workflow not initialized")
 
-            await mongo.update_run(run_id, {"status": "running"})
-            await mongo.append_event(
-                run_id,
-                type="node",
-                node="Queue",
-                payload={"node": "Queue", "status": "end", "message": "Dequeued"},
-            )
-            await mongo.set_node_progress(
-                run_id,
-                node="Queue",
-                payload={"node": "Queue", "status": "end", "message": "Dequeued"},
-            )
+            await deps.run_slots.acquire()
+            has_slot = True
+            dequeued = {"node": "Queue", "status": "end", "message": "Dequeued"}
+            await mongo.update_run(run_id, {"status": "running"}, progress={"Queue": dequeued})
+            # Only the Queue node event rides with the batched node telemetry.
+            batcher = deps.event_batcher
+            batcher.add_event(run_id, type="node", node="Queue", payload=dequeued)
 
             graph = deps.graph
             run_doc = await mongo.get_run(run_id)
@@ -136,7 +211,11 @@ def create_app() -> FastAPI:
                 },
             }
 
-            final_state = await graph.ainvoke(initial_state)
+            try:
+                final_state = await graph.ainvoke(initial_state)
+            finally:
+                # Write out any node telemetry still queued for this run.
+                await batcher.flush()
 
             constraints = final_state.get("constraints")
             final_output = final_state.get("final_output")
@@ -144,7 +223,10 @@ def create_app() -> FastAPI:
 
             if final_output:
                 await mongo.add_artifact(
-                    run_id, type="final_output", payload={"final_output": final_output}
+                    run_id,
+                    type="final_output",
+                    payload={"final_output": final_output},
+                    idempotent=True,
                 )
 
             await mongo.update_run(
@@ -153,7 +235,6 @@ def create_app() -> FastAPI:
                     "status": "done",
                     "constraints": constraints,
                     "warnings": warnings,
-                    "final_output": final_output,
                     "error": None,
                 },
             )
@@ -179,11 +260,13 @@ def create_app() -> FastAPI:
                     },
                 )
         finally:
+            if has_slot:
+                deps.run_slots.release()
             app.state.background_tasks.pop(run_id, None)
 
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.parsed_cors_origins(),
+        allow_origins=settings.parsed_cors_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
@@ -268,21 +351,15 @@ def create_app() -> FastAPI:
         options = dict(req.options or {})
         constraints = req.constraints.model_dump() if req.constraints else None
 
-        await mongo.create_run(
-            run_id,
-            constraints=constraints,
-            options=options,
-        )
-        await mongo.append_event(
-            run_id,
-            type="node",
-            node="Queue",
-            payload={"node": "Queue", "status": "start", "message": "Queued"},
-        )
-        await mongo.set_node_progress(
-            run_id,
-            node="Queue",
-            payload={"node": "Queue", "status": "start", "message": "Queued"},
+        queued = {"node": "Queue", "status": "start", "message": "Queued"}
+        await asyncio.gather(
+            mongo.create_run(
+                run_id,
+                constraints=constraints,
+                options=options,
+                progress={"Queue": queued},
+            ),
+            mongo.append_event(run_id, type="node", node="Queue", payload=queued),
         )
 
         task = asyncio.create_task(_execute_run(deps, run_id))
@@ -290,7 +367,7 @@ def create_app() -> FastAPI:
         return RunCreateResponse(runId=run_id)
 
     @app.get("/runs/{runId}", response_model=RunGetResponse)
-    async def get_run(runId: str, request: Request) -> RunGetResponse:
+    async def get_run(runId: str, request: Request) -> Response:
         deps = getattr(request.app.state, "deps", None)
         mongo = getattr(deps, "mongo", None) if deps else None
         if not mongo:
@@ -299,15 +376,24 @@ def create_app() -> FastAPI:
         if not doc:
             raise HTTPException(status_code=404, detail="Run not found")
 
-        return RunGetResponse(
-            runId=doc["_id"],
-            status=doc["status"],
-            updatedAt=doc["updatedAt"],
-            progress=doc.get("progress"),
-            constraints=doc.get("constraints"),
-            final_output=doc.get("final_output"),
-            warnings=doc.get("warnings") or [],
-            error=doc.get("error"),
+        final_output = doc.get("final_output")
+        if final_output is None and doc["status"] == "done":
+            final_output = await mongo.get_final_output(runId)
+
+        # The doc comes from our own writes, so skip re-validating it (and the
+        # potentially large final_output) against RunGetResponse; the model is
+        # kept on the route for the OpenAPI schema.
+        return ORJSONResponse(
+            {
+                "runId": doc["_id"],
+                "status": doc["status"],
+                "updatedAt": doc["updatedAt"],
+                "progress": doc.get("progress"),
+                "constraints": doc.get("constraints"),
+                "final_output": final_output,
+                "warnings": doc.get("warnings") or [],
+                "error": doc.get("error"),
+            }
         )
 
     @app.get("/runs/{runId}/events")
@@ -333,20 +419,7 @@ def create_app() -> FastAPI:
             idle = 0
 
             try:
-                pipeline = [
-                    {
-                        "$match": {
-                            "operationType": "insert",
-                            "fullDocument.runId": runId,
-                        }
-                    }
-                ]
-
-                async with mongo.run_events.watch(
-                    pipeline,
-                    full_document="default",
-                    max_await_time_ms=1000,
-                ) as stream:
+                async with mongo.watch_events(runId) as stream:
                     cursor_ts = _epoch()
                     cursor_id = None
                     saw_terminal = False
@@ -377,9 +450,12 @@ def create_app() -> FastAPI:
                         if change is None:
                             idle += 1
                             if idle >= 5:
-                                run = await mongo.get_run(runId)
-                                if run and run.get("status") in {"done", "error", "cancelled"}:
+                                status = await mongo.get_run_status(runId)
+                                if status in {"done", "error", "cancelled"}:
                                     return
+                            # try_next waits up to 1s, so idle counts ~seconds.
+                            if idle % int(SSE_KEEPALIVE_INTERVAL) == 0:
+                                yield SSE_KEEPALIVE
                             continue
 
                         idle = 0
@@ -398,9 +474,13 @@ def create_app() -> FastAPI:
                         yield _format_event(doc)
 
             except PyMongoError:
+                # No change streams (standalone mongod): poll, backing off
+                # 0.05s -> 1s with jitter while idle and resetting on activity.
                 cursor_ts = _epoch()
                 cursor_id = None
                 idle = 0
+                loop = asyncio.get_running_loop()
+                last_activity = last_ping = loop.time()
                 try:
                     while True:
                         if await request.is_disconnected():
@@ -410,16 +490,24 @@ def create_app() -> FastAPI:
                         )
                         if events:
                             idle = 0
+                            last_activity = loop.time()
                             for ev in events:
                                 cursor_ts = ev["ts"]
                                 cursor_id = ev.get("_id")
                                 yield _format_event(ev)
-                        else:
-                            idle += 1
-                            run = await mongo.get_run(runId)
-                            if run and run.get("status") in {"done", "error", "cancelled"} and idle >= 5:
+                            continue
+                        # Drain for a few seconds after the run finishes so
+                        # late events still reach the client.
+                        if loop.time() - last_activity >= 3:
+                            status = await mongo.get_run_status(runId)
+                            if status in {"done", "error", "cancelled"}:
                                 return
-                            await asyncio.sleep(0.5)
+                        if loop.time() - max(last_activity, last_ping) >= SSE_KEEPALIVE_INTERVAL:
+                            last_ping = loop.time()
+                            yield SSE_KEEPALIVE
+                        delay = min(1.0, 0.05 * 2 ** min(idle, 5)) * (0.5 + random.random())
+                        idle += 1
+                        await asyncio.sleep(delay)
                 except asyncio.CancelledError:
                     return
 
@@ -440,44 +528,61 @@ def create_app() -> FastAPI:
             task.cancel()
         return {"ok": True}
 
-    @app.get("/runs/{runId}/export/pdf")
-    async def export_pdf(runId: str, request: Request):
+    async def _serve_export(
+        runId: str,
+        request: Request,
+        *,
+        fmt: str,
+        media_type: str,
+        render: Callable[[dict, dict], bytes],
+    ) -> Response:
         deps = getattr(request.app.state, "deps", None)
         mongo = getattr(deps, "mongo", None) if deps else None
         if not mongo:
             raise HTTPException(status_code=500, detail="MongoDB is not configured")
-        doc = await mongo.get_run(runId)
+        doc = await mongo.get_run(runId, projection=EXPORT_PROJECTION)
         if not doc:
             raise HTTPException(status_code=404, detail="Run not found")
         if doc["status"] != "done":
             raise HTTPException(status_code=400, detail="Run is not completed")
-        final_output = doc.get("final_output") or {}
-        constraints = doc.get("constraints") or {}
-        pdf_bytes = generate_pdf(final_output, constraints)
-        return StreamingResponse(
-            iter([pdf_bytes]),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f'attachment; filename="spot-on-{runId}.pdf"'},
+        etag = _export_etag(doc, fmt)
+        if (cached := _not_modified(request, etag)) is not None:
+            return cached
+
+        cache = deps.export_cache
+        content = cache.get((runId, fmt), etag)
+        if content is None:
+            final_output = doc.get("final_output")
+            if final_output is None:
+                final_output = await mongo.get_final_output(runId)
+            final_output = final_output or {}
+            constraints = doc.get("constraints") or {}
+            content = await asyncio.to_thread(render, final_output, constraints)
+            cache.put((runId, fmt), etag, content)
+        return Response(
+            content=content,
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="spot-on-{runId}.{fmt}"',
+                "ETag": etag,
+                "Cache-Control": EXPORT_CACHE_CONTROL,
+            },
+        )
+
+    @app.get("/runs/{runId}/export/pdf")
+    async def export_pdf(runId: str, request: Request):
+        return await _serve_export(
+            runId, request, fmt="pdf", media_type="application/pdf", render=generate_pdf
         )
 
     @app.get("/runs/{runId}/export/xlsx")
     async def export_xlsx(runId: str, request: Request):
-        deps = getattr(request.app.state, "deps", None)
-        mongo = getattr(deps, "mongo", None) if deps else None
-        if not mongo:
-            raise HTTPException(status_code=500, detail="MongoDB is not configured")
-        doc = await mongo.get_run(runId)
-        if not doc:
-            raise HTTPException(status_code=404, detail="Run not found")
-        if doc["status"] != "done":
-            raise HTTPException(status_code=400, detail="Run is not completed")
-        final_output = doc.get("final_output") or {}
-        constraints = doc.get("constraints") or {}
-        xlsx_bytes = generate_xlsx(final_output, constraints)
-        return StreamingResponse(
-            iter([xlsx_bytes]),
+        return await _serve_export(
+            runId,
+            request,
+            fmt="xlsx",
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f'attachment; filename="spot-on-{runId}.xlsx"'},
+            render=generate_xlsx,
         )
 
     return app
@@ -5,6 +5,8 @@ from typing import Literal
 from pydantic import BaseModel, Field
 from pydantic import field_validator, model_validator
 
+from app.utils.ids import slugify
+
 _NULL_STRINGS = {"null", "none", "n/a", "na", "unknown", ""}
 
 
@@ -238,6 +240,7 @@ class QueryContext(BaseModel):
     destination: str
     origin_city: str
     destination_city: str
+    destination_slug: str = ""
     origin_code: str | None = None
     destination_code: str | None = None
     departing_date: str
@@ -289,6 +292,7 @@ class QueryContext(BaseModel):
             destination=dest_from_constraints,
             origin_city=origin_city,
             destination_city=dest_city,
+            destination_slug=slugify(dest_city),
             origin_code=origin_code,
             destination_code=dest_code,
             departing_date=constraints.departing_date,
@@ -1,23 +1,61 @@
 import io
 from typing import Any
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.platypus import (
-    Paragraph,
-    SimpleDocTemplate,
-    Spacer,
-    Table,
-    TableStyle,
+# reportlab and openpyxl are imported inside the generators: together they add
+# ~150ms to app startup and are only needed when a user exports a run.
+
+_NAME_FIELDS = ("name", "provider", "airline")
+
+
+def _labelled(fields: list[str]) -> tuple[tuple[str, str], ...]:
+    """(field, "Title Case Label") pairs, computed once at import."""
+    return tuple((f, f.replace("_", " ").title()) for f in fields)
+
+
+# (section title, final_output key, detail fields) — the item's name field is
+# rendered as its heading, so it is left out of the detail rows.
+_PDF_SECTIONS = tuple(
+    (title, key, tuple(fl for fl in _labelled(fields) if fl[0] not in _NAME_FIELDS))
+    for title, key, fields in (
+        ("Flights", "flights", ["airline", "route", "trip_type", "price_range", "url"]),
+        ("Car Rentals", "car_rentals", ["provider", "vehicle_class", "price_per_day", "pickup_location", "url"]),
+        ("Hotels", "hotels", ["name", "price_per_night", "area", "why_recommended", "url"]),
+        ("Dining", "restaurants", ["name", "cuisine", "price_range", "area", "why_recommended", "url"]),
+        ("Must-See Spots", "travel_spots", ["name", "kind", "area", "why_recommended", "url"]),
+    )
 )
 
-from openpyxl import Workbook
-from openpyxl.styles import Font
+# (sheet name, final_output key, columns, header row)
+_XLSX_SHEETS = tuple(
+    (name, key, tuple(columns), [label for _, label in _labelled(columns)])
+    for name, key, columns in (
+        ("Restaurants", "restaurants",
+         ["name", "cuisine", "price_range", "rating", "area", "operating_hours", "why_recommended", "menu_url", "reservation_url", "url"]),
+        ("Attractions", "travel_spots",
+         ["name", "kind", "area", "operating_hours", "admission_price", "estimated_duration_min", "why_recommended", "reservation_url", "url"]),
+        ("Hotels", "hotels",
+         ["name", "price_per_night", "area", "amenities", "why_recommended", "url"]),
+        ("Car Rentals", "car_rentals",
+         ["provider", "vehicle_class", "price_per_day", "pickup_location", "operating_hours", "url"]),
+        ("Flights", "flights",
+         ["airline", "route", "trip_type", "price_range", "url"]),
+    )
+)
 
 
 def generate_pdf(final_output: dict[str, Any], constraints: dict[str, Any]) -> bytes:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (
+        Paragraph,
+        SimpleDocTemplate,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
     buf = io.BytesIO()
     doc = SimpleDocTemplate(buf, pagesize=letter, topMargin=0.6 * inch, bottomMargin=0.6 * inch)
     styles = getSampleStyleSheet()
@@ -54,29 +92,19 @@ def generate_pdf(final_output: dict[str, Any], constraints: dict[str, Any]) -> b
     elements.append(Paragraph("Spot On", title_style))
     elements.append(Paragraph(f"{trip_label} | {date_label}" if date_label else trip_label, subtitle_style))
 
-    section_configs = [
-        ("Flights", final_output.get("flights", []), ["airline", "route", "trip_type", "price_range", "url"]),
-        ("Car Rentals", final_output.get("car_rentals", []), ["provider", "vehicle_class", "price_per_day", "pickup_location", "url"]),
-        ("Hotels", final_output.get("hotels", []), ["name", "price_per_night", "area", "why_recommended", "url"]),
-        ("Dining", final_output.get("restaurants", []), ["name", "cuisine", "price_range", "area", "why_recommended", "url"]),
-        ("Must-See Spots", final_output.get("travel_spots", []), ["name", "kind", "area", "why_recommended", "url"]),
-    ]
-
-    for section_title, items, fields in section_configs:
+    append = elements.append
+    for section_title, key, fields in _PDF_SECTIONS:
+        items = final_output.get(key)
         if not items:
             continue
-        elements.append(Paragraph(section_title, section_style))
+        append(Paragraph(section_title, section_style))
         for item in items:
-            name = item.get("name") or item.get("provider") or item.get("airline") or "—"
-            elements.append(Paragraph(name, item_name_style))
-            for field in fields:
-                if field in ("name", "provider", "airline"):
-                    continue
-                val = item.get(field)
-                if val:
-                    label = field.replace("_", " ").title()
-                    elements.append(Paragraph(f"<b>{label}:</b> {val}", body_style))
-        elements.append(Spacer(1, 12))
+            get = item.get
+            append(Paragraph(get("name") or get("provider") or get("airline") or "—", item_name_style))
+            for field, label in fields:
+                if val := get(field):
+                    append(Paragraph(f"<b>{label}:</b> {val}", body_style))
+        append(Spacer(1, 12))
 
     refs = final_output.get("references", [])
     if refs:
@@ -99,24 +127,15 @@ def generate_pdf(final_output: dict[str, Any], constraints: dict[str, Any]) -> b
 
 
 def generate_xlsx(final_output: dict[str, Any], constraints: dict[str, Any]) -> bytes:
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
     wb = Workbook()
     bold = Font(bold=True)
 
-    sheet_configs = [
-        ("Restaurants", final_output.get("restaurants", []),
-         ["name", "cuisine", "price_range", "rating", "area", "operating_hours", "why_recommended", "menu_url", "reservation_url", "url"]),
-        ("Attractions", final_output.get("travel_spots", []),
-         ["name", "kind", "area", "operating_hours", "admission_price", "estimated_duration_min", "why_recommended", "reservation_url", "url"]),
-        ("Hotels", final_output.get("hotels", []),
-         ["name", "price_per_night", "area", "amenities", "why_recommended", "url"]),
-        ("Car Rentals", final_output.get("car_rentals", []),
-         ["provider", "vehicle_class", "price_per_day", "pickup_location", "operating_hours", "url"]),
-        ("Flights", final_output.get("flights", []),
-         ["airline", "route", "trip_type", "price_range", "url"]),
-    ]
-
     first = True
-    for sheet_name, items, columns in sheet_configs:
+    for sheet_name, key, columns, headers in _XLSX_SHEETS:
+        items = final_output.get(key, [])
         if first:
             ws = wb.active
             ws.title = sheet_name
@@ -124,7 +143,6 @@ def generate_xlsx(final_output: dict[str, Any], constraints: dict[str, Any]) ->
         else:
             ws = wb.create_sheet(title=sheet_name)
 
-        headers = [col.replace("_", " ").title() for col in columns]
         ws.append(headers)
 
         for cell in ws[1]:
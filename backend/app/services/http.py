@@ -0,0 +1,19 @@
+import httpx
+
+
+def build_http_transport(
+    *, max_connections: int = 100, max_keepalive_connections: int = 50
+) -> httpx.AsyncHTTPTransport:
+    """Process-wide connection pool shared by the OpenAI and Tavily clients.
+
+    Each service wraps it in its own ``httpx.AsyncClient`` (they configure
+    different base URLs and headers) but all requests reuse the same pooled,
+    HTTP/2-multiplexed connections. Closed once on app shutdown.
+    """
+    return httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+    )
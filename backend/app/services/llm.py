@@ -1,17 +1,56 @@
 import asyncio
+import logging
+from collections.abc import AsyncIterator
+from typing import Any, get_args
 
+import httpx
+from langchain_core.callbacks import UsageMetadataCallbackHandler
 from langchain_core.messages import BaseMessage
 from langchain_openai import ChatOpenAI
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+
+from app.utils.llm_cache import LLMCache
+
+logger = logging.getLogger(__name__)
 
 
 class LLMService:
-    def __init__(self, api_key: str, model: str, *, timeout_seconds: float = 60.0) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        *,
+        timeout_seconds: float = 60.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: LLMCache | None = None,
+    ) -> None:
         if not api_key:
             raise ValueError("OPENAI_API_KEY is required")
         self.timeout_seconds = max(1.0, float(timeout_seconds))
+        http_async_client = (
+            httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(self.timeout_seconds, connect=5.0),
+            )
+            if transport is not None
+            else None
+        )
         self.chat = ChatOpenAI(
-            api_key=api_key, model=model, temperature=0, timeout=self.timeout_seconds
+            api_key=api_key,
+            model=model,
+            temperature=0,
+            timeout=self.timeout_seconds,
+            http_async_client=http_async_client,
+            stream_usage=True,
+        )
+        # Responses are only reusable when decoding is deterministic.
+        self.cache = cache if self.chat.temperature == 0 else None
+
+    def _cache_key(self, messages: list[BaseMessage], output_schema: type[BaseModel]) -> str:
+        return LLMCache.key(
+            self.chat.model_name,
+            output_schema.__name__,
+            [(m.type, m.content) for m in messages],
         )
 
     async def structured(
@@ -19,12 +58,149 @@ class LLMService:
         messages: list[BaseMessage],
         output_schema: type[BaseModel],
     ) -> BaseModel:
+        cache_key = self._cache_key(messages, output_schema) if self.cache else None
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return output_schema.model_validate(cached)
+
         chain = self.chat.with_structured_output(output_schema)
+        usage = UsageMetadataCallbackHandler()
         try:
-            return await asyncio.wait_for(
-                chain.ainvoke(messages), timeout=self.timeout_seconds
+            result = await asyncio.wait_for(
+                chain.ainvoke(messages, config={"callbacks": [usage]}),
+                timeout=self.timeout_seconds,
             )
         except asyncio.TimeoutError as e:
             raise TimeoutError(
                 f"OpenAI request timed out after {self.timeout_seconds:.0f}s"
-            ) from e
\ No newline at end of file
+            ) from e
+        self._log_usage(usage, output_schema.__name__)
+        if cache_key:
+            await self.cache.set(cache_key, result.model_dump())
+        return result
+
+    async def batch_structured(
+        self,
+        jobs: list[tuple[list[BaseMessage], type[BaseModel]]],
+        *,
+        max_concurrency: int | None = None,
+    ) -> list[BaseModel | BaseException]:
+        """Run several structured calls as batches, returning results in job order.
+
+        Jobs sharing a schema go through one structured-output runnable's
+        ``abatch`` (over the shared HTTP/2 connection pool). Failed jobs come
+        back as exceptions instead of raising.
+        """
+        results: list[BaseModel | BaseException | None] = [None] * len(jobs)
+        keys: list[str | None] = [None] * len(jobs)
+        groups: dict[type[BaseModel], list[int]] = {}
+        for i, (messages, schema) in enumerate(jobs):
+            if self.cache:
+                keys[i] = self._cache_key(messages, schema)
+                cached = await self.cache.get(keys[i])
+                if cached is not None:
+                    results[i] = schema.model_validate(cached)
+                    continue
+            groups.setdefault(schema, []).append(i)
+
+        async def _run_group(schema: type[BaseModel], idxs: list[int]) -> None:
+            chain = self.chat.with_structured_output(schema)
+            usage = UsageMetadataCallbackHandler()
+            config: dict[str, Any] = {"callbacks": [usage]}
+            if max_concurrency:
+                config["max_concurrency"] = max_concurrency
+            try:
+                outs = await asyncio.wait_for(
+                    chain.abatch([jobs[i][0] for i in idxs], config=config, return_exceptions=True),
+                    timeout=self.timeout_seconds,
+                )
+            except asyncio.TimeoutError:
+                outs = [
+                    TimeoutError(f"OpenAI batch timed out after {self.timeout_seconds:.0f}s")
+                ] * len(idxs)
+            self._log_usage(usage, f"{schema.__name__} x{len(idxs)}")
+            for i, out in zip(idxs, outs):
+                results[i] = out
+                if keys[i] and not isinstance(out, BaseException):
+                    await self.cache.set(keys[i], out.model_dump())
+
+        await asyncio.gather(*[_run_group(schema, idxs) for schema, idxs in groups.items()])
+        return results
+
+    @staticmethod
+    def _log_usage(usage: UsageMetadataCallbackHandler, label: str) -> None:
+        """Log token usage, including prompt-cache hits on the shared prompt prefix."""
+        for model, meta in usage.usage_metadata.items():
+            details = meta.get("input_token_details") or {}
+            logger.info(
+                "LLM usage (%s, %s): input=%d cache_read=%d output=%d",
+                label,
+                model,
+                meta.get("input_tokens", 0),
+                details.get("cache_read", 0),
+                meta.get("output_tokens", 0),
+            )
+
+    async def stream_structured(
+        self,
+        messages: list[BaseMessage],
+        output_schema: type[BaseModel],
+        list_field: str,
+    ) -> AsyncIterator[BaseModel]:
+        """Stream the items of ``output_schema.<list_field>`` as they complete.
+
+        The schema is passed as a plain JSON schema so the parser emits partial
+        objects while tokens arrive; an item is validated and yielded once the
+        model has moved on to the next one (the last item after the stream
+        ends). The overall call is bounded by the service timeout.
+        """
+        item_model = get_args(output_schema.model_fields[list_field].annotation)[0]
+        cache_key = self._cache_key(messages, output_schema) if self.cache else None
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                for raw in cached[list_field]:
+                    yield item_model.model_validate(raw)
+                return
+
+        chain = self.chat.with_structured_output(output_schema.model_json_schema())
+        usage = UsageMetadataCallbackHandler()
+        stream = chain.astream(messages, config={"callbacks": [usage]}).__aiter__()
+        deadline = asyncio.get_running_loop().time() + self.timeout_seconds
+        items: list = []
+        emitted = 0
+        completed: list[BaseModel] = []
+
+        def _validated(raw: object) -> BaseModel | None:
+            try:
+                item = item_model.model_validate(raw)
+            except ValidationError as e:
+                logger.warning("Dropping invalid streamed %s: %s", item_model.__name__, e)
+                return None
+            completed.append(item)
+            return item
+
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                partial = await asyncio.wait_for(anext(stream), timeout=max(remaining, 0))
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError as e:
+                raise TimeoutError(
+                    f"OpenAI request timed out after {self.timeout_seconds:.0f}s"
+                ) from e
+            items = (partial or {}).get(list_field) or []
+            while emitted < len(items) - 1:
+                item = _validated(items[emitted])
+                emitted += 1
+                if item is not None:
+                    yield item
+
+        self._log_usage(usage, output_schema.__name__)
+        tail = [item for raw in items[emitted:] if (item := _validated(raw)) is not None]
+        if cache_key:
+            await self.cache.set(cache_key, {list_field: [i.model_dump() for i in completed]})
+        for item in tail:
+            yield item
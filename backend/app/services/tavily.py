@@ -2,6 +2,7 @@ import asyncio
 import logging
 from typing import Any
 
+import httpx
 from tavily import AsyncTavilyClient
 
 logger = logging.getLogger(__name__)
@@ -13,11 +14,13 @@ class TavilyService:
         api_key: str,
         *,
         search_timeout_seconds: float = 10.0,
-        extract_timeout_seconds: float = 30.0
+        extract_timeout_seconds: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
         if not api_key:
             raise ValueError("TAVILY_API_KEY is required")
-        self.client = AsyncTavilyClient(api_key=api_key)
+        client = httpx.AsyncClient(transport=transport) if transport is not None else None
+        self.client = AsyncTavilyClient(api_key=api_key, client=client)
         self.search_timeout_seconds = max(1.0, float(search_timeout_seconds))
         self.extract_timeout_seconds = max(1.0, float(extract_timeout_seconds))
 
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 
@@ -17,12 +18,26 @@ _TRACKING_KEYS = {
 
 
 def normalize_name(name: str) -> str:
-    s = (name or "").strip().lower()
+    if not isinstance(name, str):
+        name = ""
+    return _normalize_name(name)
+
+
+def canonicalize_url(url: str) -> str:
+    if not isinstance(url, str):
+        return url
+    return _canonicalize_url(url)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    s = name.strip().lower()
     s = _WS_RE.sub(" ", s)
     return s
 
 
-def canonicalize_url(url: str) -> str:
+@lru_cache(maxsize=4096)
+def _canonicalize_url(url: str) -> str:
     try:
         p = urlparse(url)
     except Exception:
@@ -0,0 +1,27 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class ExportCache:
+    """In-process LRU of rendered export bytes.
+
+    Each entry is stored with a version (the export ETag). A lookup only hits
+    when the version still matches, so a changed run is re-rendered.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._store: OrderedDict[Hashable, tuple[str, bytes]] = OrderedDict()
+
+    def get(self, key: Hashable, version: str) -> bytes | None:
+        entry = self._store.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._store.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, version: str, content: bytes) -> None:
+        self._store[key] = (version, content)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
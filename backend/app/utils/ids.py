@@ -1,4 +1,28 @@
+import re
 import uuid
+from contextvars import ContextVar
+from functools import lru_cache
+
+_NON_WORD = re.compile(r"\W+")
+
+# Bound by _execute_run for the duration of a run; graph nodes (and any tasks
+# they spawn) inherit it, so they need not look the id up in state.
+current_run_id: ContextVar[str | None] = ContextVar("current_run_id", default=None)
+
 
 def new_run_id() -> str:
     return str(uuid.uuid4())
+
+
+@lru_cache(maxsize=1024)
+def slugify(value: str) -> str:
+    """Destination slug used in item ids (e.g. "Paris, France" -> "paris_france")."""
+    return _NON_WORD.sub("_", value.lower()).strip("_")
+
+
+def assign_ids(items: list[dict], prefix: str) -> list[dict]:
+    """Number already-dumped items in place as ``<prefix>_<n>`` (1-based)."""
+    head = f"{prefix}_"
+    for i, item in enumerate(items, 1):
+        item["id"] = head + str(i)
+    return items
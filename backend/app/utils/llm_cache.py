@@ -0,0 +1,42 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+
+
+class LLMCache:
+    """In-process TTL + LRU cache for deterministic (temperature=0) LLM responses.
+
+    Values are plain JSON-able dicts (``model_dump()`` output). The async
+    get/set interface matches what a shared backend such as Redis would need,
+    so the store can be swapped without touching callers.
+    """
+
+    def __init__(self, *, ttl_seconds: float = 3600.0, max_entries: int = 512) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._store: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        payload = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.sha256(payload).hexdigest()
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._store[key]
+            return None
+        self._store.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._store[key] = (time.monotonic() + (ttl or self.ttl_seconds), value)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
@@ -1,7 +1,11 @@
-import json
 from typing import Any
 
+import orjson
+
+# SSE comment frame: ignored by EventSource, but keeps proxies from closing idle streams.
+SSE_KEEPALIVE = b": keepalive\n\n"
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+
 def sse_event(event: str, data: dict[str, Any]) -> bytes:
-    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
-    msg = f"event: {event}\ndata: {payload}\n\n"
-    return msg.encode("utf-8")
+    return b"event: %s\ndata: %s\n\n" % (event.encode("utf-8"), orjson.dumps(data))
@@ -44,6 +44,7 @@ def mock_deps(mock_mongo, mock_llm, mock_tavily):
     deps.mongo = mock_mongo
     deps.llm = mock_llm
     deps.tavily = mock_tavily
+    deps.event_batcher = MagicMock()
     deps.settings = SimpleNamespace(
         openai_api_key="test-key",
         openai_model="gpt-test",
@@ -54,6 +55,9 @@ def mock_deps(mock_mongo, mock_llm, mock_tavily):
         mongodb_uri="mongodb://localhost:27017",
         db_name="test_db",
         cors_origins="http://localhost:3000",
+        min_llm_items=1,
+        normalize_max_tokens=12000,
+        agent_normalize_timeout=40,
     )
     deps.graph = None
     return deps
@@ -96,6 +96,51 @@ class TestGetRun:
         assert data["runId"] == "r1"
         assert data["status"] == "done"
 
+    def test_serializes_nested_output(self, app_with_mongo):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value={
+            "_id": "r1",
+            "status": "error",
+            "updatedAt": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            "progress": {"nodes": {"Queue": {"node": "Queue", "status": "end"}}},
+            "final_output": {"hotels": [{"name": "H", "price": 120}]},
+            "warnings": None,
+            "error": {"message": "boom"},
+        })
+        resp = client.get("/runs/r1")
+        assert resp.headers["content-type"] == "application/json"
+        data = resp.json()
+        assert data["updatedAt"] == "2024-01-01T00:00:00Z"
+        assert data["final_output"]["hotels"][0]["price"] == 120
+        assert data["warnings"] == []
+        assert data["error"] == {"message": "boom"}
+
+
+    def test_reads_final_output_from_artifact(self, app_with_mongo):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value={
+            "_id": "r1",
+            "status": "done",
+            "updatedAt": datetime.now(timezone.utc),
+            "final_output": None,
+        })
+        mongo.get_final_output = AsyncMock(return_value={"hotels": [{"name": "H"}]})
+        resp = client.get("/runs/r1")
+        assert resp.json()["final_output"] == {"hotels": [{"name": "H"}]}
+        mongo.get_final_output.assert_awaited_once_with("r1")
+
+    def test_running_run_skips_artifact_lookup(self, app_with_mongo):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value={
+            "_id": "r1",
+            "status": "running",
+            "updatedAt": datetime.now(timezone.utc),
+        })
+        mongo.get_final_output = AsyncMock()
+        resp = client.get("/runs/r1")
+        assert resp.json()["final_output"] is None
+        mongo.get_final_output.assert_not_awaited()
+
 
 class TestCancelRun:
     def test_returns_ok_even_if_not_found(self):
@@ -125,3 +170,66 @@ class TestExportXlsx:
         mongo.get_run = AsyncMock(return_value=None)
         resp = client.get("/runs/r1/export/xlsx")
         assert resp.status_code == 404
+
+
+class TestExportCaching:
+    def _done_run(self):
+        return {
+            "_id": "r1",
+            "status": "done",
+            "updatedAt": datetime(2026, 3, 1, tzinfo=timezone.utc),
+            "final_output": {},
+            "constraints": {},
+        }
+
+    def test_sets_validators(self, app_with_mongo):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value=self._done_run())
+        resp = client.get("/runs/r1/export/xlsx")
+        assert resp.status_code == 200
+        assert resp.headers["etag"]
+        assert resp.headers["cache-control"] == "private, max-age=300"
+
+    def test_304_on_matching_etag(self, app_with_mongo):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value=self._done_run())
+        etag = client.get("/runs/r1/export/xlsx").headers["etag"]
+        resp = client.get("/runs/r1/export/xlsx", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+    def test_if_none_match_list_and_weak_tags(self, app_with_mongo):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value=self._done_run())
+        etag = client.get("/runs/r1/export/xlsx").headers["etag"]
+        for header in (f'"other", W/{etag}', "*"):
+            resp = client.get("/runs/r1/export/xlsx", headers={"If-None-Match": header})
+            assert resp.status_code == 304
+
+    def test_etag_substring_is_not_a_match(self, app_with_mongo):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value=self._done_run())
+        etag = client.get("/runs/r1/export/xlsx").headers["etag"]
+        resp = client.get("/runs/r1/export/xlsx", headers={"If-None-Match": f'"x{etag}x"'})
+        assert resp.status_code == 200
+
+    def test_sends_content_length(self, app_with_mongo):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value=self._done_run())
+        resp = client.get("/runs/r1/export/xlsx")
+        assert int(resp.headers["content-length"]) == len(resp.content)
+
+    def test_repeat_export_served_from_cache(self, app_with_mongo, monkeypatch):
+        client, app, mongo = app_with_mongo
+        mongo.get_run = AsyncMock(return_value=self._done_run())
+        calls = []
+
+        def fake_xlsx(final_output, constraints):
+            calls.append(1)
+            return b"xlsx-bytes"
+
+        monkeypatch.setattr("app.main.generate_xlsx", fake_xlsx)
+        first = client.get("/runs/r1/export/xlsx")
+        second = client.get("/runs/r1/export/xlsx")
+        assert first.content == second.content == b"xlsx-bytes"
+        assert len(calls) == 1
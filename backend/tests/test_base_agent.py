@@ -45,6 +45,12 @@ class TestFlattenSearchResults:
     def test_empty_results(self):
         assert BaseAgent._flatten_search_results([]) == []
 
+    def test_trims_raw_content(self):
+        page = "p" * (BaseAgent.RAW_CONTENT_CAP + 50)
+        search_results = [{"ok": True, "response": {"results": [{"title": "A", "raw_content": page}]}}]
+        result = BaseAgent._flatten_search_results(search_results)
+        assert len(result[0]["raw_content"]) == BaseAgent.RAW_CONTENT_CAP
+
 
 class TestTopByScore:
     def test_sorts_descending(self):
@@ -152,3 +158,188 @@ class TestFailedResult:
     def test_custom_warnings(self, agent):
         result = agent._failed_result("err", warnings=["custom warning"])
         assert result["warnings"] == ["custom warning"]
+
+
+class TestChunkItems:
+    def _items(self, n: int, content: str = "x") -> list[dict]:
+        return [{"title": f"T{i}", "url": f"https://a.com/{i}", "content": content} for i in range(n)]
+
+    def test_fixed_size_without_budget(self):
+        chunks = BaseAgent._chunk_items(self._items(10), chunk_size=4)
+        assert [len(c) for c in chunks] == [4, 4, 2]
+
+    def test_single_chunk_when_under_budget(self):
+        chunks = BaseAgent._chunk_items(self._items(10), chunk_size=4, max_tokens=12000)
+        assert len(chunks) == 1
+        assert len(chunks[0]) == 10
+
+    def test_splits_by_token_budget(self):
+        items = self._items(6, content="y" * 400)
+        chunks = BaseAgent._chunk_items(items, chunk_size=2, max_tokens=250)
+        assert sum(len(c) for c in chunks) == 6
+        assert len(chunks) > 1
+
+    def test_empty(self):
+        assert BaseAgent._chunk_items([], chunk_size=4, max_tokens=100) == []
+
+    def test_estimate_uses_given_limits(self):
+        items = [
+            {"title": f"T{i}", "url": f"https://a.com/{i}", "content": "c", "raw_content": "r" * 3000}
+            for i in range(6)
+        ]
+        assert len(BaseAgent._chunk_items(items, chunk_size=2, max_tokens=1000)) > 1
+        chunks = BaseAgent._chunk_items(
+            items, chunk_size=2, max_tokens=1000, content_limit=400, raw_content_limit=0
+        )
+        assert chunks == [items]
+
+
+class TestDedupAndFormat:
+    def test_matches_separate_passes(self):
+        items = [
+            {"title": "A", "url": "https://a.com/", "content": "one"},
+            {"title": "A", "url": "https://a.com", "content": "dup"},
+            {"title": "B", "url": "https://b.com", "content": "two"},
+        ]
+        text, deduped = BaseAgent._dedup_and_format(items, raw_content_limit=0)
+        expected = BaseAgent._dedup_by_url_and_title(items)
+        assert deduped == expected
+        assert text == BaseAgent._format_search_text(expected, raw_content_limit=0)
+        assert text.startswith("Total items: 2")
+
+    def test_token_budget_drops_tail(self):
+        items = [
+            {"title": f"T{i}", "url": f"https://a.com/{i}", "content": "x" * 400}
+            for i in range(10)
+        ]
+        text, kept = BaseAgent._dedup_and_format(items, max_total_tokens=300)
+        assert 0 < len(kept) < 10
+        assert kept == items[: len(kept)]
+        assert text.startswith(f"Total items: {len(kept)}")
+
+    def test_dropped_count_skips_duplicates(self, caplog):
+        items = [
+            {"title": "A", "url": "https://a.com", "content": "x" * 400},
+            {"title": "B", "url": "https://b.com", "content": "x" * 400},
+            {"title": "B", "url": "https://b.com/", "content": "dup"},
+            {"title": "A", "url": "https://a.com", "content": "dup"},
+        ]
+        with caplog.at_level("INFO", logger="app.agents.base"):
+            _, kept = BaseAgent._dedup_and_format(items, max_total_tokens=150)
+
+        assert [i["title"] for i in kept] == ["A"]
+        assert "dropped_items=1" in caplog.text
+
+
+class TestNormalizeCategory:
+    async def test_slow_attempt_is_retried(self, mock_deps):
+        calls = 0
+
+        async def _stream(messages, schema, field):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(10)
+            yield "item"
+
+        mock_deps.llm.stream_structured = _stream
+        mock_deps.settings.agent_normalize_timeout = 0.05
+        agent = ConcreteAgent("test_agent", mock_deps)
+        items = [{"title": "A", "url": "https://a.com", "content": "x"}]
+
+        result = await agent._normalize_category(
+            "restaurants", items, {"destination_city": "Paris"}, run_id="r1"
+        )
+
+        assert result == ["item"]
+        assert calls == 2
+
+    async def test_chunked_slow_attempt_is_retried(self, mock_deps):
+        calls = 0
+
+        async def _stream(messages, schema, field):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(10)
+            yield "item"
+
+        mock_deps.llm.stream_structured = _stream
+        mock_deps.settings.agent_normalize_timeout = 0.05
+        agent = ConcreteAgent("test_agent", mock_deps)
+        items = [{"title": "A", "url": "https://a.com", "content": "x"}]
+
+        result = await agent._normalize_chunked(
+            items,
+            lambda chunk: agent._normalize_category("restaurants", chunk, {}, run_id="r1"),
+            chunk_size=4,
+        )
+
+        assert result == ["item"]
+        assert calls == 2
+
+    async def test_chunked_keeps_streamed_items_when_attempts_time_out(self, mock_deps):
+        async def _stream(messages, schema, field):
+            yield "partial"
+            await asyncio.sleep(10)
+
+        mock_deps.llm.stream_structured = _stream
+        mock_deps.settings.agent_normalize_timeout = 0.02
+        agent = ConcreteAgent("test_agent", mock_deps)
+        items = [{"title": "A", "url": "https://a.com", "content": "x"}]
+
+        result = await agent._normalize_chunked(
+            items,
+            lambda chunk: agent._normalize_category("restaurants", chunk, {}, run_id="r1"),
+            chunk_size=4,
+        )
+
+        assert result == ["partial"]
+
+    async def test_single_restaurant_result_still_uses_llm(self, mock_deps):
+        async def _stream(messages, schema, field):
+            yield "venue-1"
+            yield "venue-2"
+
+        mock_deps.llm.stream_structured = _stream
+        agent = ConcreteAgent("test_agent", mock_deps)
+        items = [{"title": "THE 10 BEST Restaurants in Paris", "url": "https://a.com", "content": "x"}]
+
+        result = await agent._normalize_category("restaurants", items, {}, run_id="r1")
+
+        assert result == ["venue-1", "venue-2"]
+
+    async def test_structured_items_skip_llm(self, mock_deps):
+        mock_deps.llm.stream_structured = AsyncMock()
+        agent = ConcreteAgent("test_agent", mock_deps)
+        items = [
+            {"provider": "Hertz", "url": "https://hertz.com", "title": "Hertz",
+             "why_recommended": "Airport desk", "price_per_day": "45"},
+            {"provider": "Avis", "url": "https://avis.com", "title": "Avis",
+             "why_recommended": "Downtown"},
+        ]
+
+        result = await agent._normalize_category("cars", items, {}, run_id="r1")
+
+        assert [c.provider for c in result] == ["Hertz", "Avis"]
+        assert result[0].price_per_day == "45"
+        mock_deps.llm.stream_structured.assert_not_called()
+
+    async def test_large_input_formatted_off_loop(self, mock_deps, monkeypatch):
+        seen = []
+
+        async def _stream(messages, schema, field):
+            seen.append(messages[1].content)
+            yield "item"
+
+        mock_deps.llm.stream_structured = _stream
+        agent = ConcreteAgent("test_agent", mock_deps)
+        items = [{"title": "A", "url": "https://a.com", "content": "x"}]
+        to_thread = AsyncMock(wraps=asyncio.to_thread)
+        monkeypatch.setattr(asyncio, "to_thread", to_thread)
+        agent.FORMAT_OFFLOAD_CHARS = 1
+
+        await agent._normalize_category("restaurants", items, {}, run_id="r1")
+
+        to_thread.assert_awaited_once()
+        assert seen[0].endswith(BaseAgent._format_search_text(items, raw_content_limit=0))
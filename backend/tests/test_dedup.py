@@ -50,3 +50,6 @@ class TestCanonicalizeUrl:
     def test_adds_default_path(self):
         result = canonicalize_url("https://example.com")
         assert result == "https://example.com/"
+
+    def test_non_string_passes_through(self):
+        assert canonicalize_url(None) is None
@@ -0,0 +1,87 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from app.agents.enrichment import EnrichmentAgent
+
+
+def _state(n: int) -> dict:
+    return {
+        "runId": "r1",
+        "hotels": [{"id": f"h{i}", "name": f"H{i}", "url": f"https://h{i}.example"} for i in range(n)],
+    }
+
+
+class TestParallelBatches:
+    async def test_splits_gaps_into_concurrent_disjoint_batches(self, mock_deps):
+        mock_deps.settings.agent_enrich_timeout = 30
+        mock_deps.settings.tavily_call_cap = 3
+        mock_deps.settings.enrich_max_items_per_pass = 4
+        agent = EnrichmentAgent("enrichment_agent", mock_deps)
+
+        with patch.object(EnrichmentAgent, "_enrich_batch", AsyncMock(return_value=1)) as batch:
+            out = await agent.execute(_state(5))
+
+        assert batch.await_count == 2
+        ids = [[g["id"] for g in call.args[0]] for call in batch.await_args_list]
+        assert ids == [["h0", "h2"], ["h1", "h3"]]
+        assert out["enrichment_loop_count"] == 1
+
+    async def test_gaps_sharing_a_url_stay_in_one_batch(self, mock_deps):
+        mock_deps.settings.agent_enrich_timeout = 30
+        mock_deps.settings.tavily_call_cap = 3
+        mock_deps.settings.enrich_max_items_per_pass = 4
+        agent = EnrichmentAgent("enrichment_agent", mock_deps)
+        state = _state(3)
+        state["hotels"][1]["url"] = "https://h0.example/"
+
+        with patch.object(EnrichmentAgent, "_enrich_batch", AsyncMock(return_value=1)) as batch:
+            await agent.execute(state)
+
+        ids = [[g["id"] for g in call.args[0]] for call in batch.await_args_list]
+        assert ids == [["h0", "h1"], ["h2"]]
+
+    async def test_batches_share_one_tavily_budget(self, mock_deps):
+        mock_deps.settings.agent_enrich_timeout = 30
+        mock_deps.settings.tavily_call_cap = 1
+        mock_deps.settings.enrich_max_items_per_pass = 4
+        mock_deps.tavily.extract = AsyncMock(return_value={"results": []})
+        agent = EnrichmentAgent("enrichment_agent", mock_deps)
+
+        await agent.execute(_state(4))
+
+        assert mock_deps.tavily.extract.await_count == 1
+
+    async def test_concurrent_runs_get_their_own_budget(self, mock_deps):
+        mock_deps.settings.tavily_call_cap = 1
+        mock_deps.settings.enrich_max_items_per_pass = 4
+        extracted: list[list[str]] = []
+
+        async def _extract(urls):
+            extracted.append(urls)
+            await asyncio.sleep(0)
+            return {"results": []}
+
+        mock_deps.tavily.extract = _extract
+        agent = EnrichmentAgent("enrichment_agent", mock_deps)
+        other = {"runId": "r2", "hotels": [{"id": "x0", "name": "X0", "url": "https://x0.example"}]}
+        enriched_a: dict = {}
+        enriched_b: dict = {}
+
+        await asyncio.gather(
+            agent._run(_state(2), enriched_a), agent._run(other, enriched_b)
+        )
+
+        assert len(extracted) == 2
+        assert ["https://x0.example"] in extracted
+
+    async def test_nothing_to_enrich_skips_batches(self, mock_deps):
+        mock_deps.settings.agent_enrich_timeout = 30
+        mock_deps.settings.tavily_call_cap = 3
+        mock_deps.settings.enrich_max_items_per_pass = 2
+        agent = EnrichmentAgent("enrichment_agent", mock_deps)
+
+        with patch.object(EnrichmentAgent, "_enrich_batch", AsyncMock(return_value=0)) as batch:
+            out = await agent.execute({"runId": "r1"})
+
+        batch.assert_not_awaited()
+        assert out["agent_statuses"] == {"enrichment_agent": "skipped"}
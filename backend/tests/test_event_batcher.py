@@ -0,0 +1,128 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.db.event_batcher import MongoEventBatcher
+from app.db.mongo import MongoService
+
+
+@pytest.fixture
+def mongo():
+    svc = MongoService("mongodb://localhost:27017", "test_db")
+    for name in ("runs", "run_events", "artifacts"):
+        coll = MagicMock(bulk_write=AsyncMock())
+        coll.with_options.return_value = coll
+        setattr(svc, name, coll)
+    return svc
+
+
+class TestMongoEventBatcher:
+    async def test_flush_issues_one_bulk_write_per_collection(self, mongo):
+        batcher = MongoEventBatcher(mongo)
+        payload = {"node": "HotelAgent", "status": "start"}
+        batcher.add_event("run-1", type="node", node="HotelAgent", payload=payload)
+        batcher.set_node_progress("run-1", node="HotelAgent", payload=payload)
+        batcher.add_node_end_log("run-1", node="HotelAgent", input={}, output={})
+
+        await batcher.flush()
+
+        events = mongo.run_events.bulk_write.await_args.args[0]
+        assert len(events) == 2
+        assert mongo.run_events.bulk_write.await_args.kwargs["ordered"] is False
+        assert len(mongo.artifacts.bulk_write.await_args.args[0]) == 2
+        mongo.runs.bulk_write.assert_awaited_once()
+
+    async def test_progress_updates_fold_per_run(self, mongo):
+        batcher = MongoEventBatcher(mongo)
+        batcher.set_node_progress("run-1", node="A", payload={"status": "start"})
+        batcher.set_node_progress("run-1", node="A", payload={"status": "end"})
+        batcher.set_node_progress("run-1", node="B", payload={"status": "start"})
+
+        await batcher.flush()
+
+        (op,) = mongo.runs.bulk_write.await_args.args[0]
+        patch = op._doc["$set"]
+        assert patch["progress.nodes.A"] == {"status": "end"}
+        assert patch["progress.nodes.B"] == {"status": "start"}
+
+    async def test_artifact_is_queued_with_its_event(self, mongo):
+        batcher = MongoEventBatcher(mongo)
+        batcher.add_artifact("run-1", type="constraints", payload={"constraints": {"a": 1}})
+
+        await batcher.flush()
+
+        (artifact,) = mongo.artifacts.bulk_write.await_args.args[0]
+        (event,) = mongo.run_events.bulk_write.await_args.args[0]
+        assert artifact._doc["type"] == "constraints"
+        assert event._doc["type"] == "artifact"
+        assert event._doc["payload"]["type"] == "constraints"
+        assert event._doc["ts"] == artifact._doc["ts"]
+
+    async def test_idempotent_artifact_is_an_upsert(self, mongo):
+        batcher = MongoEventBatcher(mongo)
+        batcher.add_artifact("run-1", type="constraints", payload={}, idempotent=True)
+
+        await batcher.flush()
+
+        (op,) = mongo.artifacts.bulk_write.await_args.args[0]
+        assert op._filter == {"runId": "run-1", "type": "constraints"}
+        assert op._upsert is True
+
+    async def test_empty_flush_writes_nothing(self, mongo):
+        await MongoEventBatcher(mongo).flush()
+
+        mongo.run_events.bulk_write.assert_not_awaited()
+        mongo.runs.bulk_write.assert_not_awaited()
+
+    def test_rejects_bad_node_name(self, mongo):
+        with pytest.raises(ValueError, match="Invalid node name"):
+            MongoEventBatcher(mongo).set_node_progress("run-1", node="a.b", payload={})
+
+    async def test_write_failure_is_logged_not_raised(self, mongo):
+        mongo.run_events.bulk_write.side_effect = RuntimeError("down")
+        batcher = MongoEventBatcher(mongo)
+        batcher.add_event("run-1", type="log")
+
+        await batcher.flush()
+
+    async def test_background_loop_flushes_after_interval(self, mongo):
+        batcher = MongoEventBatcher(mongo, flush_interval=0.01)
+        batcher.start()
+        batcher.add_event("run-1", type="log")
+
+        await asyncio.sleep(0.05)
+
+        mongo.run_events.bulk_write.assert_awaited_once()
+        await batcher.aclose()
+
+    async def test_aclose_flushes_pending(self, mongo):
+        batcher = MongoEventBatcher(mongo, flush_interval=60)
+        batcher.start()
+        batcher.add_event("run-1", type="log")
+
+        await batcher.aclose()
+
+        mongo.run_events.bulk_write.assert_awaited_once()
+
+    def test_background_writes_are_unacknowledged(self, mongo):
+        MongoEventBatcher(mongo)
+
+        write_concern = mongo.run_events.with_options.call_args.kwargs["write_concern"]
+        assert write_concern.acknowledged is False
+
+    async def test_only_events_skip_acknowledgement(self, mongo):
+        unacked = MagicMock(bulk_write=AsyncMock())
+        mongo.run_events.with_options.return_value = unacked
+        batcher = MongoEventBatcher(mongo)
+        batcher.set_node_progress("run-1", node="A", payload={"status": "start"})
+        batcher.add_artifact("run-1", type="constraints", payload={"city": "Paris"})
+
+        await batcher.flush(acknowledged=False)
+
+        unacked.bulk_write.assert_awaited_once()
+        mongo.run_events.bulk_write.assert_not_awaited()
+        mongo.runs.bulk_write.assert_awaited_once()
+        mongo.artifacts.bulk_write.assert_awaited_once()
+        mongo.runs.with_options.assert_not_called()
+        mongo.artifacts.with_options.assert_not_called()
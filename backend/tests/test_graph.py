@@ -0,0 +1,140 @@
+from unittest.mock import AsyncMock, patch
+
+from app.graph import graph as graph_module
+from app.graph.graph import _merge_updates, build_graph
+
+
+class TestMergeUpdates:
+    def test_applies_state_reducers(self):
+        merged = _merge_updates([
+            {"restaurants": [1], "agent_statuses": {"A": "ok"}, "warnings": ["a"]},
+            {"hotels": [2], "agent_statuses": {"B": "failed"}, "warnings": ["b"]},
+            {},
+        ])
+        assert merged == {
+            "restaurants": [1],
+            "hotels": [2],
+            "agent_statuses": {"A": "ok", "B": "failed"},
+            "warnings": ["a", "b"],
+        }
+
+
+class TestDomainFanOut:
+    async def test_runs_agents_in_one_node_with_per_agent_events(self, mock_deps):
+        with patch.object(graph_module, "parse_request", AsyncMock(return_value={})), \
+                patch.object(graph_module, "quality_split", AsyncMock(return_value={})), \
+                patch.object(graph_module.RestaurantAgent, "execute", AsyncMock(return_value={"restaurants": [1]})), \
+                patch.object(graph_module.AttractionsAgent, "execute", AsyncMock(side_effect=RuntimeError("boom"))), \
+                patch.object(graph_module.HotelAgent, "execute", AsyncMock(return_value={"hotels": [2]})), \
+                patch.object(graph_module.TransportAgent, "execute", AsyncMock(return_value={"flights": [3]})), \
+                patch.object(graph_module.BudgetAgent, "execute", AsyncMock(return_value={})):
+            graph = build_graph(mock_deps)
+            out = await graph.ainvoke(
+                {"runId": "r1", "skip_enrichment": True, "agent_statuses": {}, "warnings": []}
+            )
+
+        assert out["restaurants"] == [1] and out["hotels"] == [2] and out["flights"] == [3]
+        assert out["agent_statuses"] == {"AttractionsAgent": "failed"}
+        assert out["warnings"] == ["AttractionsAgent failed: boom"]
+        nodes = {c.kwargs["node"] for c in mock_deps.event_batcher.add_event.call_args_list}
+        assert {"RestaurantAgent", "AttractionsAgent", "HotelAgent", "TransportAgent"} <= nodes
+        assert "DomainAgents" not in nodes
+        # Every node but QualitySplit (light telemetry) logs its I/O.
+        assert mock_deps.event_batcher.add_node_end_log.call_count == 6
+        for call in mock_deps.event_batcher.add_node_end_log.call_args_list:
+            assert set(call.kwargs["input"]) <= set(graph_module._LOGGABLE_KEYS)
+
+
+class TestNodeCache:
+    async def test_reuses_domain_output_for_same_query_context(self, mock_deps):
+        from app.utils.llm_cache import LLMCache
+
+        mock_deps.node_cache = LLMCache(ttl_seconds=60)
+        hotel = AsyncMock(return_value={"hotels": [{"name": "H"}], "agent_statuses": {"hotel_agent": "completed"}})
+        attractions = AsyncMock(return_value={"agent_statuses": {"attractions_agent": "failed"}})
+        with patch.object(graph_module, "parse_request", AsyncMock(return_value={})), \
+                patch.object(graph_module, "quality_split", AsyncMock(return_value={})), \
+                patch.object(graph_module.RestaurantAgent, "execute", AsyncMock(return_value={})), \
+                patch.object(graph_module.AttractionsAgent, "execute", attractions), \
+                patch.object(graph_module.HotelAgent, "execute", hotel), \
+                patch.object(graph_module.TransportAgent, "execute", AsyncMock(return_value={})), \
+                patch.object(graph_module.BudgetAgent, "execute", AsyncMock(return_value={})):
+            graph = build_graph(mock_deps)
+            state = {"runId": "r1", "skip_enrichment": True, "query_context": {"destination_city": "Seoul"}}
+            await graph.ainvoke(dict(state))
+            out = await graph.ainvoke(dict(state, runId="r2"))
+
+        hotel.assert_awaited_once()
+        assert out["hotels"] == [{"name": "H"}]
+        # Failed outputs are not cached.
+        assert attractions.await_count == 2
+
+
+class TestRunIdContext:
+    async def test_wrap_reads_bound_run_id(self, mock_deps):
+        from app.utils.ids import current_run_id
+
+        node = graph_module._wrap(mock_deps, "BudgetAgent", AsyncMock(return_value={}), pass_deps_kwarg=False)
+        token = current_run_id.set("ctx-run")
+        try:
+            await node({})
+        finally:
+            current_run_id.reset(token)
+
+        run_ids = {c.args[0] for c in mock_deps.event_batcher.add_event.call_args_list}
+        assert run_ids == {"ctx-run"}
+
+
+class TestLightTelemetry:
+    async def test_keeps_only_terminal_event(self, mock_deps):
+        node = graph_module._wrap(
+            mock_deps, "QualitySplit", AsyncMock(return_value={}), pass_deps_kwarg=False, full_telemetry=False
+        )
+        await node({"runId": "r1"})
+
+        statuses = [c.kwargs["payload"]["status"] for c in mock_deps.event_batcher.add_event.call_args_list]
+        assert statuses == ["end"]
+        mock_deps.event_batcher.add_node_end_log.assert_not_called()
+
+
+class TestDeferredStartEvent:
+    async def test_fast_node_emits_only_end_with_duration(self, mock_deps):
+        node = graph_module._wrap(mock_deps, "BudgetAgent", AsyncMock(return_value={}), pass_deps_kwarg=False)
+        await node({"runId": "r1"})
+
+        (call,) = mock_deps.event_batcher.add_event.call_args_list
+        assert call.kwargs["payload"]["status"] == "end"
+        assert "durationMs" in call.kwargs["payload"]
+
+    async def test_slow_node_emits_start(self, mock_deps, monkeypatch):
+        import asyncio
+
+        monkeypatch.setattr(graph_module, "NODE_START_EVENT_DELAY", 0)
+
+        async def slow(state):
+            await asyncio.sleep(0.01)
+            return {}
+
+        node = graph_module._wrap(mock_deps, "BudgetAgent", slow, pass_deps_kwarg=False)
+        await node({"runId": "r1"})
+
+        statuses = [c.kwargs["payload"]["status"] for c in mock_deps.event_batcher.add_event.call_args_list]
+        assert statuses == ["start", "end"]
+
+
+class TestEnrichCache:
+    async def test_reuses_enrichment_for_same_items(self, mock_deps):
+        from app.utils.llm_cache import LLMCache
+
+        mock_deps.node_cache = LLMCache(ttl_seconds=60)
+        enrich = AsyncMock(return_value={"enriched_data": {"h1": {"amenities": ["wifi"]}}})
+        node = graph_module._wrap(
+            mock_deps, "EnrichAgent", enrich, pass_deps_kwarg=False, cache_on=graph_module._ENRICH_CACHE_KEYS
+        )
+        state = {"query_context": {"destination_city": "Seoul"}, "hotels": [{"id": "h1"}]}
+        await node(dict(state, runId="r1"))
+        out = await node(dict(state, runId="r2"))
+        await node(dict(state, runId="r3", hotels=[{"id": "h2"}]))
+
+        assert enrich.await_count == 2
+        assert out["enriched_data"] == {"h1": {"amenities": ["wifi"]}}
@@ -0,0 +1,32 @@
+from unittest.mock import patch
+
+from app.utils.llm_cache import LLMCache
+
+
+class TestLLMCache:
+    def test_key_is_order_independent_for_dicts(self):
+        assert LLMCache.key("m", {"a": 1, "b": 2}) == LLMCache.key("m", {"b": 2, "a": 1})
+        assert LLMCache.key("m", "x") != LLMCache.key("m", "y")
+
+    async def test_get_returns_stored_value(self):
+        cache = LLMCache()
+        await cache.set("k", {"hotels": []})
+        assert await cache.get("k") == {"hotels": []}
+        assert await cache.get("missing") is None
+
+    async def test_entries_expire(self):
+        cache = LLMCache(ttl_seconds=10)
+        with patch("app.utils.llm_cache.time.monotonic", return_value=100.0):
+            await cache.set("k", 1)
+        with patch("app.utils.llm_cache.time.monotonic", return_value=111.0):
+            assert await cache.get("k") is None
+
+    async def test_evicts_least_recently_used(self):
+        cache = LLMCache(max_entries=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
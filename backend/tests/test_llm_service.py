@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from app.schemas.spot_on import HotelList, RestaurantEnrichment
+from app.services.llm import LLMService
+from app.utils.llm_cache import LLMCache
+
+
+def _hotel(i: int) -> dict:
+    return {
+        "id": f"h{i}",
+        "name": f"Hotel {i}",
+        "url": f"https://h.com/{i}",
+        "snippet": "Nice",
+        "why_recommended": "Central",
+    }
+
+
+@pytest.fixture
+def llm():
+    return LLMService("test-key", "gpt-test", timeout_seconds=5)
+
+
+def _fake_chain(partials):
+    async def astream(messages, config=None):
+        for p in partials:
+            yield p
+
+    chain = MagicMock()
+    chain.astream = astream
+    return chain
+
+
+class TestStreamStructured:
+    async def test_yields_items_as_they_complete(self, llm):
+        partials = [
+            {"hotels": [{"id": "h1", "name": "Hot"}]},
+            {"hotels": [_hotel(1), {"id": "h2"}]},
+            {"hotels": [_hotel(1), _hotel(2)]},
+        ]
+        llm.chat = MagicMock()
+        llm.chat.with_structured_output.return_value = _fake_chain(partials)
+
+        names = [h.name async for h in llm.stream_structured([], HotelList, "hotels")]
+
+        assert names == ["Hotel 1", "Hotel 2"]
+        schema = llm.chat.with_structured_output.call_args.args[0]
+        assert isinstance(schema, dict)
+
+    async def test_skips_invalid_items(self, llm):
+        partials = [{"hotels": [{"id": "bad"}, _hotel(2)]}]
+        llm.chat = MagicMock()
+        llm.chat.with_structured_output.return_value = _fake_chain(partials)
+
+        items = [h async for h in llm.stream_structured([], HotelList, "hotels")]
+
+        assert [h.id for h in items] == ["h2"]
+
+
+class TestResponseCache:
+    async def test_stream_replays_cached_items(self):
+        llm = LLMService("test-key", "gpt-test", timeout_seconds=5, cache=LLMCache())
+        messages = [HumanMessage(content="hotels in Paris")]
+        partials = [{"hotels": [_hotel(1), _hotel(2)]}]
+
+        with patch.object(ChatOpenAI, "with_structured_output", return_value=_fake_chain(partials)) as wso:
+            first = [h.id async for h in llm.stream_structured(messages, HotelList, "hotels")]
+            second = [h.id async for h in llm.stream_structured(messages, HotelList, "hotels")]
+
+        assert first == second == ["h1", "h2"]
+        assert wso.call_count == 1
+
+
+class TestBatchStructured:
+    async def test_groups_by_schema_and_keeps_order(self, llm):
+        chains = {}
+
+        def _chain_for(schema):
+            async def abatch(inputs, config=None, return_exceptions=False):
+                if schema is HotelList:
+                    return [HotelList(hotels=[_hotel(len(m))]) for m in inputs]
+                return [ValueError("boom") for _ in inputs]
+
+            chain = MagicMock()
+            chain.abatch = abatch
+            chains[schema] = chain
+            return chain
+
+        llm.chat = MagicMock()
+        llm.chat.with_structured_output.side_effect = _chain_for
+        jobs = [
+            ([HumanMessage(content="a")], HotelList),
+            ([HumanMessage(content="b")], RestaurantEnrichment),
+            ([HumanMessage(content="c"), HumanMessage(content="d")], HotelList),
+        ]
+
+        results = await llm.batch_structured(jobs)
+
+        assert [h.id for h in results[0].hotels] == ["h1"]
+        assert isinstance(results[1], ValueError)
+        assert [h.id for h in results[2].hotels] == ["h2"]
+        assert set(chains) == {HotelList, RestaurantEnrichment}
@@ -1,6 +1,6 @@
 import pytest
 
-from app.db.mongo import MongoService
+from app.db.mongo import MongoService, pack_payload, unpack_payload
 
 
 class TestMongoServiceInit:
@@ -39,3 +39,207 @@ class TestSetNodeProgress:
             "run-1", node="ParseRequest", payload={"status": "start"}
         )
         mongo.runs.update_one.assert_called_once()
+
+
+class TestWatchEvents:
+    def test_filters_inserts_for_run(self):
+        from unittest.mock import MagicMock
+
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        mongo.run_events = MagicMock()
+
+        mongo.watch_events("run-1")
+
+        pipeline = mongo.run_events.watch.call_args.args[0]
+        assert pipeline[0]["$match"] == {"operationType": "insert", "fullDocument.runId": "run-1"}
+        assert mongo.run_events.watch.call_args.kwargs["max_await_time_ms"] == 1000
+
+
+class TestBatchedWrites:
+    @pytest.fixture
+    def mongo(self):
+        from unittest.mock import AsyncMock, MagicMock
+
+        svc = MongoService("mongodb://localhost:27017", "test_db")
+        svc.artifacts = MagicMock(insert_one=AsyncMock(), insert_many=AsyncMock())
+        svc.run_events = MagicMock(insert_one=AsyncMock(), insert_many=AsyncMock())
+        return svc
+
+    async def test_add_artifact_returns_client_side_id(self, mongo):
+        artifact_id = await mongo.add_artifact("run-1", type="final_output", payload={"a": 1})
+
+        doc = mongo.artifacts.insert_one.await_args.args[0]
+        assert doc["_id"] == artifact_id
+        event = mongo.run_events.insert_one.await_args.args[0]
+        assert event["payload"] == {"type": "final_output", "payload": {"a": 1}}
+
+    async def test_idempotent_artifact_upserts_on_run_and_type(self, mongo):
+        from unittest.mock import AsyncMock, MagicMock
+
+        mongo.artifacts.update_one = AsyncMock(return_value=MagicMock(upserted_id=None))
+        await mongo.add_artifact("run-1", type="constraints", payload={"a": 1}, idempotent=True)
+
+        filter_, update = mongo.artifacts.update_one.await_args.args
+        assert filter_ == {"runId": "run-1", "type": "constraints"}
+        assert update["$set"]["payload"] == {"a": 1}
+        assert mongo.artifacts.update_one.await_args.kwargs["upsert"] is True
+        mongo.artifacts.insert_one.assert_not_called()
+
+    async def test_node_end_log_writes_both_artifacts_at_once(self, mongo):
+        await mongo.append_node_end_log("run-1", node="HotelAgent", input={}, output={})
+
+        docs = mongo.artifacts.insert_many.await_args.args[0]
+        assert [d["type"] for d in docs] == ["node_input", "node_output"]
+        event = mongo.run_events.insert_one.await_args.args[0]
+        assert event["payload"]["output"]["artifactId"] == str(docs[1]["_id"])
+
+
+class TestUpdateRunProgress:
+    async def test_folds_progress_into_one_update(self):
+        from unittest.mock import AsyncMock
+
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        mongo.runs.update_one = AsyncMock()
+
+        await mongo.update_run("run-1", {"status": "running"}, progress={"Queue": {"status": "end"}})
+
+        mongo.runs.update_one.assert_awaited_once()
+        patch = mongo.runs.update_one.await_args.args[1]["$set"]
+        assert patch["status"] == "running"
+        assert patch["progress.nodes.Queue"] == {"status": "end"}
+
+    async def test_rejects_bad_progress_node(self):
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        with pytest.raises(ValueError, match="Invalid node name"):
+            await mongo.update_run("run-1", {}, progress={"a.b": {}})
+
+
+class TestCreateRun:
+    async def test_created_and_updated_share_timestamp(self):
+        from unittest.mock import AsyncMock
+
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        mongo.runs.insert_one = AsyncMock()
+
+        await mongo.create_run("run-1", constraints=None, options={})
+
+        doc = mongo.runs.insert_one.await_args.args[0]
+        assert doc["createdAt"] is doc["updatedAt"]
+
+
+class TestGetRunStatus:
+    async def test_projects_status_only(self):
+        from unittest.mock import AsyncMock
+
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        mongo.runs.find_one = AsyncMock(return_value={"_id": "run-1", "status": "done"})
+
+        assert await mongo.get_run_status("run-1") == "done"
+        assert mongo.runs.find_one.await_args.kwargs["projection"] == {"status": 1}
+
+    async def test_missing_run(self):
+        from unittest.mock import AsyncMock
+
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        mongo.runs.find_one = AsyncMock(return_value=None)
+
+        assert await mongo.get_run_status("nope") is None
+
+
+class TestEnsureIndexes:
+    @pytest.fixture
+    def mongo(self):
+        from unittest.mock import AsyncMock, MagicMock
+
+        svc = MongoService("mongodb://localhost:27017", "test_db")
+        svc.runs = MagicMock(create_indexes=AsyncMock())
+        svc.run_events = MagicMock(create_index=AsyncMock(), create_indexes=AsyncMock())
+        svc.run_events.name = "run_events"
+        svc.artifacts = MagicMock(create_indexes=AsyncMock())
+        svc.db = MagicMock(command=AsyncMock())
+        return svc
+
+    async def test_creates_ttl_index_on_event_ts(self, mongo):
+        await mongo.ensure_indexes(events_ttl_seconds=3600)
+
+        ttl_call = mongo.run_events.create_index.await_args
+        assert ttl_call.args[0] == [("ts", 1)]
+        assert ttl_call.kwargs["expireAfterSeconds"] == 3600
+
+    async def test_batches_indexes_per_collection(self, mongo):
+        await mongo.ensure_indexes()
+
+        for coll, count in ((mongo.runs, 2), (mongo.run_events, 1), (mongo.artifacts, 2)):
+            coll.create_indexes.assert_awaited_once()
+            assert len(coll.create_indexes.await_args.args[0]) == count
+
+    async def test_zero_ttl_skips_index(self, mongo):
+        await mongo.ensure_indexes(events_ttl_seconds=0)
+
+        mongo.run_events.create_index.assert_not_awaited()
+        mongo.artifacts.create_indexes.assert_awaited_once()
+
+    async def test_retunes_existing_ttl_index(self, mongo):
+        from pymongo.errors import OperationFailure
+
+        mongo.run_events.create_index.side_effect = OperationFailure("conflict", code=85)
+
+        await mongo.ensure_indexes(events_ttl_seconds=60)
+
+        cmd = mongo.db.command.call_args.args[0]
+        assert cmd == {"collMod": "run_events", "index": {"name": "ts_ttl", "expireAfterSeconds": 60}}
+
+
+class TestGetFinalOutput:
+    async def test_reads_latest_artifact_payload(self):
+        from unittest.mock import AsyncMock
+
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        mongo.artifacts.find_one = AsyncMock(
+            return_value={"payload": {"final_output": {"hotels": []}}}
+        )
+
+        assert await mongo.get_final_output("run-1") == {"hotels": []}
+        kwargs = mongo.artifacts.find_one.await_args.kwargs
+        assert mongo.artifacts.find_one.await_args.args[0] == {"runId": "run-1", "type": "final_output"}
+        assert kwargs["sort"][0] == ("ts", -1)
+
+    async def test_missing_artifact(self):
+        from unittest.mock import AsyncMock
+
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        mongo.artifacts.find_one = AsyncMock(return_value=None)
+
+        assert await mongo.get_final_output("run-1") is None
+
+
+class TestPayloadPacking:
+    def test_small_payload_stays_inline(self):
+        payload = {"final_output": {"hotels": []}}
+        assert pack_payload(payload) is payload
+
+    def test_large_payload_round_trips_compressed(self):
+        payload = {"final_output": {"hotels": [{"name": f"Hotel {i}", "area": "x" * 40} for i in range(200)]}}
+
+        packed = pack_payload(payload)
+
+        assert set(packed) == {"_z"}
+        assert len(packed["_z"]) < 4096
+        assert unpack_payload(packed) == payload
+
+    def test_unserializable_payload_stored_as_is(self):
+        from bson import ObjectId
+
+        payload = {"id": ObjectId(), "blob": "x" * 5000}
+        assert pack_payload(payload) is payload
+
+    async def test_get_final_output_unpacks(self):
+        from unittest.mock import AsyncMock
+
+        final_output = {"restaurants": [{"name": "R" * 50}] * 100}
+        mongo = MongoService("mongodb://localhost:27017", "test_db")
+        mongo.artifacts.find_one = AsyncMock(
+            return_value={"payload": pack_payload({"final_output": final_output})}
+        )
+
+        assert await mongo.get_final_output("run-1") == final_output
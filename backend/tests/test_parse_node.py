@@ -32,6 +32,7 @@ async def test_parse_request_validates_and_derives_query_context():
     assert ctx["trip_type"] == "round-trip"
     assert ctx["origin_city"] == "Paris"
     assert ctx["destination_city"] == "Singapore"
+    assert ctx["destination_slug"] == "singapore"
     assert ctx["origin_code"] == "CDG"
     assert ctx["destination_code"] == "SIN"
     assert ctx["depart_year"] == 2026
@@ -70,3 +71,8 @@ async def test_parse_request_uses_llm_location_normalization_for_query_context(m
     assert ctx["origin_code"] == "SFO"
     assert ctx["destination_city"] == "Tokyo"
     assert ctx["destination_code"] is None
+
+    batcher_call = mock_deps.event_batcher.add_artifact.call_args
+    assert batcher_call.args == ("r1",)
+    assert batcher_call.kwargs["type"] == "constraints"
+    assert batcher_call.kwargs["payload"] == {"constraints": out["constraints"]}
@@ -91,3 +91,54 @@ class TestQualitySplit:
         }
         result = await quality_split(state, deps=mock_deps)
         assert len(result["main_results"]["car_rentals"]) == 1
+
+    async def test_demotion_does_not_mutate_state_items(self, mock_deps):
+        raw = {"id": "r1", "name": "Bare", "url": "https://bare.com"}
+        state = {"runId": "r1", "restaurants": [raw], "enriched_data": {}, "references": []}
+        result = await quality_split(state, deps=mock_deps)
+        ref = result["references"][0]
+        assert ref["section"] == "restaurant"
+        assert ref["title"] == "Bare"
+        assert "section" not in raw
+
+    async def test_clears_consumed_state(self, mock_deps):
+        state = {
+            "runId": "r1",
+            "hotels": [{"id": "h1", "name": "H", "url": "https://h.com", "price_per_night": "100"}],
+            "enriched_data": {"h1": {"amenities": ["wifi"]}},
+            "references": [],
+        }
+        result = await quality_split(state, deps=mock_deps)
+        assert result["hotels"] == []
+        assert result["enriched_data"] == {}
+        assert result["main_results"]["hotels"][0]["amenities"] == ["wifi"]
+
+    async def test_references_skip_main_pick_urls(self, mock_deps):
+        state = {
+            "runId": "r1",
+            "restaurants": [
+                {"id": "r1", "name": "Main", "url": "https://a.com/list", "cuisine": "Thai"},
+                {"id": "r2", "name": "Same Page", "url": "https://A.com/list?utm_source=x"},
+                {"id": "r3", "name": "Other", "url": "https://b.com"},
+            ],
+            "enriched_data": {},
+            "references": [{"url": "https://a.com/list", "title": "Old"}],
+        }
+        result = await quality_split(state, deps=mock_deps)
+        assert [r["title"] for r in result["references"]] == ["Other"]
+
+
+class TestApplyEnrichment:
+    def test_fills_only_empty_fields(self):
+        from app.graph.nodes.quality_split import _apply_enrichment
+
+        item = {"id": "r1", "cuisine": "Thai", "price_range": None}
+        out = _apply_enrichment(item, {"cuisine": "Lao", "price_range": "$$", "menu_url": "https://m"})
+        assert out == {"id": "r1", "cuisine": "Thai", "price_range": "$$", "menu_url": "https://m"}
+        assert item["price_range"] is None
+
+    def test_returns_item_when_nothing_to_fill(self):
+        from app.graph.nodes.quality_split import _apply_enrichment
+
+        item = {"id": "r1", "cuisine": "Thai"}
+        assert _apply_enrichment(item, {"cuisine": "Lao"}) is item
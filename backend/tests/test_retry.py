@@ -0,0 +1,36 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.agents.retry import with_retry
+
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    with patch("app.agents.retry.asyncio.sleep", new=AsyncMock()) as sleep:
+        yield sleep
+
+
+class TestWithRetry:
+    async def test_returns_first_success(self):
+        fn = AsyncMock(return_value="ok")
+        assert await with_retry(fn) == "ok"
+        assert fn.await_count == 1
+
+    async def test_retries_transient_then_succeeds(self, no_sleep):
+        fn = AsyncMock(side_effect=[TimeoutError("slow"), "ok"])
+        assert await with_retry(fn) == "ok"
+        assert fn.await_count == 2
+        no_sleep.assert_awaited_once()
+
+    async def test_gives_up_after_max_attempts(self):
+        fn = AsyncMock(side_effect=TimeoutError("slow"))
+        with pytest.raises(TimeoutError):
+            await with_retry(fn, max_attempts=3)
+        assert fn.await_count == 3
+
+    async def test_non_transient_not_retried(self):
+        fn = AsyncMock(side_effect=ValueError("bad schema"))
+        with pytest.raises(ValueError):
+            await with_retry(fn)
+        assert fn.await_count == 1
@@ -1,6 +1,6 @@
 import json
 
-from app.utils.sse import sse_event
+from app.utils.sse import SSE_KEEPALIVE, sse_event
 
 
 class TestSseEvent:
@@ -36,3 +36,9 @@ class TestSseEvent:
         # With ensure_ascii=False, non-ASCII chars should appear directly
         assert "café" in text
         assert "\\u" not in text
+
+
+class TestKeepalive:
+    def test_is_a_comment_frame(self):
+        assert SSE_KEEPALIVE.startswith(b":")
+        assert SSE_KEEPALIVE.endswith(b"\n\n")
@@ -0,0 +1,183 @@
+from unittest.mock import AsyncMock, MagicMock
+
+from app.agents.transport import TransportAgent
+from app.schemas.spot_on import CarRentalList, CarRentalOutput, FlightOutput
+
+
+QCTX = {
+    "origin_city": "Tokyo",
+    "origin_code": "NRT",
+    "destination_city": "Seoul",
+    "destination_code": "ICN",
+    "departing_date": "2026-03-15",
+    "returning_date": "2026-03-18",
+}
+
+
+def _car(i: int) -> CarRentalOutput:
+    return CarRentalOutput(
+        id=f"c{i}", provider="Hertz", url=f"https://hertz.com/{i}", why_recommended="Close"
+    )
+
+
+def _flight(i: int) -> FlightOutput:
+    return FlightOutput(
+        id=f"f{i}",
+        route="NRT -> ICN",
+        trip_type="round-trip",
+        url=f"https://kayak.com/{i}",
+        snippet="Direct",
+        why_recommended="Cheap",
+    )
+
+
+def _stream(*items):
+    async def gen(*args, **kwargs):
+        for item in items:
+            yield item
+
+    return MagicMock(side_effect=gen)
+
+
+class TestCategoryPrompt:
+    async def test_run_data_stays_out_of_system_prompt(self, mock_deps):
+        mock_deps.llm.stream_structured = _stream(_car(1))
+        agent = TransportAgent("transport_agent", mock_deps)
+
+        cars = await agent._normalize_category(
+            "cars",
+            [
+                {"title": "Hertz", "url": "https://hertz.com/1", "content": "cars"},
+                {"title": "Avis", "url": "https://avis.com/1", "content": "cars"},
+            ],
+            QCTX,
+            run_id="r1",
+        )
+
+        assert len(cars) == 1
+        messages, schema, field = mock_deps.llm.stream_structured.call_args.args
+        assert (schema, field) == (CarRentalList, "cars")
+        # Run data stays out of the system prompt so its prefix is cacheable.
+        assert "Seoul" not in messages[0].content
+        assert "Seoul" in messages[1].content
+
+
+class TestRouteTransportItems:
+    def test_reassigns_misrouted_items(self):
+        own, other = TransportAgent._route_transport_items(
+            "cars",
+            [
+                {"title": "Cheap flights NRT to ICN", "url": "https://a.com/1"},
+                {"title": "Hertz LAX", "url": "https://hertz.com/lax"},
+            ],
+        )
+        assert [c["url"] for c in own] == ["https://hertz.com/lax"]
+        assert [f["url"] for f in other] == ["https://a.com/1"]
+
+    def test_keeps_ambiguous_items(self):
+        own, other = TransportAgent._route_transport_items(
+            "flights", [{"title": "Flights and car rentals", "url": "https://kayak.com/x"}]
+        )
+        assert len(own) == 1 and other == []
+
+
+class TestHeuristicFastPath:
+    async def test_single_results_skip_llm(self, mock_deps):
+        mock_deps.settings.min_llm_items = 1
+        agent = TransportAgent("transport_agent", mock_deps)
+
+        cars = await agent._normalize_category(
+            "cars",
+            [{"title": "Hertz - Incheon Airport", "url": "https://hertz.com/icn",
+              "content": "Compact cars from $45 per day."}],
+            QCTX,
+            run_id="r1",
+        )
+        flights = await agent._normalize_category(
+            "flights",
+            [{"title": "Cheap flights NRT to ICN", "url": "https://kayak.com/1",
+              "content": "Round-trip fares from $1,250."}],
+            QCTX,
+            run_id="r1",
+        )
+
+        mock_deps.llm.stream_structured.assert_not_called()
+        assert cars[0].provider == "Hertz"
+        assert cars[0].price_per_day == "45"
+        assert flights[0].route == "NRT -> ICN"
+        assert flights[0].trip_type == "round-trip"
+        assert flights[0].price_range == "1250"
+
+
+class TestPipelinedExecute:
+    @staticmethod
+    def _configure(mock_deps):
+        mock_deps.settings.agent_search_timeout = 5
+        mock_deps.settings.agent_normalize_timeout = 5
+        mock_deps.settings.normalize_chunk_size = 4
+
+    async def test_shared_result_normalized_once(self, mock_deps):
+        self._configure(mock_deps)
+        shared = {"title": "Kayak", "url": "https://kayak.com/x", "content": "deals"}
+        agent = TransportAgent("transport_agent", mock_deps)
+        agent._search_car_rentals = AsyncMock(
+            return_value=[shared, {"title": "Hertz", "url": "https://hertz.com/1", "content": "c"}]
+        )
+        agent._search_flights = AsyncMock(
+            return_value=[dict(shared), {"title": "NRT-ICN", "url": "https://kayak.com/1", "content": "f"}]
+        )
+        seen_urls: list[str] = []
+
+        def _stream_for(messages, schema, field):
+            seen_urls.extend(
+                line[len("URL: "):]
+                for line in messages[1].content.splitlines()
+                if line.startswith("URL: ")
+            )
+            return _stream(_car(1) if field == "cars" else _flight(1)).side_effect()
+
+        mock_deps.llm.stream_structured = MagicMock(side_effect=_stream_for)
+
+        out = await agent.execute({"runId": "r1", "query_context": QCTX})
+
+        assert out["agent_statuses"]["transport_agent"] == "completed"
+        assert seen_urls.count("https://kayak.com/x") == 1
+        assert [c["id"] for c in out["car_rentals"]] == ["car_seoul_1"]
+        assert [f["id"] for f in out["flights"]] == ["flight_seoul_1"]
+
+    async def test_one_search_failure_is_partial(self, mock_deps):
+        self._configure(mock_deps)
+        agent = TransportAgent("transport_agent", mock_deps)
+        agent._search_car_rentals = AsyncMock(side_effect=RuntimeError("boom"))
+        agent._search_flights = AsyncMock(
+            return_value=[{"title": "NRT-ICN", "url": "https://kayak.com/1", "content": "f"}]
+        )
+        mock_deps.llm.stream_structured = _stream(_flight(1))
+
+        out = await agent.execute({"runId": "r1", "query_context": QCTX})
+
+        assert out["agent_statuses"]["transport_agent"] == "partial"
+        assert out["warnings"] == ["Car rental search failed"]
+        assert len(out["flights"]) == 1
+
+    async def test_misrouted_result_is_handed_over(self, mock_deps):
+        self._configure(mock_deps)
+        mock_deps.settings.min_llm_items = 0
+        agent = TransportAgent("transport_agent", mock_deps)
+        agent._search_car_rentals = AsyncMock(
+            return_value=[{"title": "Cheap flights NRT to ICN", "url": "https://a.com/1", "content": "f"}]
+        )
+        agent._search_flights = AsyncMock(return_value=[])
+        fields: list[str] = []
+
+        def _stream_for(messages, schema, field):
+            fields.append(field)
+            return _stream(_car(1) if field == "cars" else _flight(1)).side_effect()
+
+        mock_deps.llm.stream_structured = MagicMock(side_effect=_stream_for)
+
+        out = await agent.execute({"runId": "r1", "query_context": QCTX})
+
+        assert fields == ["flights"]
+        assert out["car_rentals"] == []
+        assert len(out["flights"]) == 1
@@ -109,6 +109,7 @@ export interface NodeEventPayload {
   status: NodeStatus;
   message?: string;
   error?: string;
+  durationMs?: number;
 }
 
 export interface RecommendedDestination {